@@ -59,10 +59,37 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task_analyzer.wsgi.application'
 
+# SQLite tuning: WAL lets readers proceed while a write is in flight,
+# synchronous=NORMAL is durable under WAL, and connections are kept open
+# across requests so the pragmas are only paid once per worker connection.
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',   # 256 MiB
+    'PRAGMA cache_size=-65536',     # 64 MiB (negative = KiB)
+    'PRAGMA temp_store=MEMORY',
+]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Per-process cache for project rankings and their per-component scores
+# (tasks.ranking). A large project has thousands of components, far past
+# the 300-entry default, which would evict them before they are reused.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
     }
 }
 
@@ -0,0 +1,46 @@
+"""
+API-only settings profile for production workers.
+
+The workers only ever serve JSON, so this profile drops the admin,
+sessions, messages, staticfiles and browsable API along with the
+middleware that backs them. Select it with
+
+    DJANGO_SETTINGS_MODULE=task_analyzer.settings_api
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'corsheaders',
+    'tasks',
+]
+
+# No sessions, cookies or HTML: CSRF, auth, messages and clickjacking
+# protection have nothing to act on.
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'task_analyzer.urls_api'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+    ],
+    # The API is open (AllowAny), so skip the session/basic authenticators
+    # and the contrib.auth AnonymousUser they need.
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
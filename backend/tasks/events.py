@@ -0,0 +1,232 @@
+"""
+Server-sent events feed of ranking changes for stored tasks.
+
+Task writes and dependency edge changes notify the per-project,
+per-strategy ``RankingFeed``s of the task's project. A feed coalesces
+notifications for a short window, re-ranks the project's stored tasks
+once, and pushes only the tasks whose score or rank moved to every
+subscriber. Feeds are per process; writes made by other worker processes
+are picked up by polling the project's ``TableVersion`` counter on every
+keep-alive tick.
+"""
+
+import asyncio
+import json
+import threading
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from .models import DEFAULT_PROJECT, TableVersion, task_version_key
+
+# Edits arriving within this window are published as one event
+COALESCE_WINDOW = 0.25
+# Seconds between keep-alive comments / cross-process version checks
+KEEPALIVE_INTERVAL = 5.0
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def compute_ranking(strategy, project=DEFAULT_PROJECT):
+    """Rank a project's stored tasks; returns ({id: (rank, score, level)}, version)"""
+    from .ranking import rank_project
+    from .scoring import TaskPriorityScorer
+
+    scorer = TaskPriorityScorer(strategy=strategy, as_of=date.today())
+    scored, version = rank_project(scorer, project)
+    ranking = {
+        task['id']: (rank, task['score'], task['priority_level'])
+        for rank, task in enumerate(scored, 1)
+    }
+    return ranking, version
+
+
+def diff_rankings(previous, current, touched=()):
+    """
+    Changes between two rankings: every task that was touched, is new or
+    whose score or rank changed, with its old and new rank, plus removed
+    ids. Applying the diff to the previous ranking yields the current one.
+    """
+    touched = set(touched)
+    changed = []
+    for task_id, (rank, score, level) in current.items():
+        before = previous.get(task_id)
+        if before is not None and task_id not in touched and before[:2] == (rank, score):
+            continue
+        changed.append({
+            'id': task_id,
+            'rank': rank,
+            'previous_rank': before[0] if before else None,
+            'score': score,
+            'previous_score': before[1] if before else None,
+            'priority_level': level,
+        })
+    changed.sort(key=lambda entry: entry['rank'])
+    removed = sorted(task_id for task_id in previous if task_id not in current)
+    return {'changed': changed, 'removed': removed, 'total_tasks': len(current)}
+
+
+class RankingFeed:
+    """Fan-out of coalesced ranking diffs for one project and strategy."""
+
+    def __init__(self, strategy, project=DEFAULT_PROJECT):
+        self.strategy = strategy
+        self.project = project
+        self.subscribers = set()
+        self.snapshot = None
+        self.version = None
+        self.sequence = 0
+        self.loop = None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._flush_scheduled = False
+        self._refreshing = None
+        # Subscribers between get_feed() and being added to ``subscribers``
+        self._joining = 0
+
+    async def subscribe(self):
+        """Register a subscriber; returns its queue and the current ranking"""
+        self.loop = asyncio.get_running_loop()
+        if self._refreshing is None:
+            self._refreshing = asyncio.Lock()
+        self._joining += 1
+        try:
+            if self.snapshot is None:
+                self.snapshot, self.version = await sync_to_async(compute_ranking)(
+                    self.strategy, self.project
+                )
+            queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+            self.subscribers.add(queue)
+        finally:
+            self._joining -= 1
+            self._release_if_idle()
+        return queue, self.snapshot
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        self._release_if_idle()
+
+    def _release_if_idle(self):
+        if self.subscribers or self._joining:
+            return
+        # Nobody is listening: rebuild from scratch on the next subscribe,
+        # and stop get_feed() handing this feed out so idle feeds for
+        # every (project, strategy) ever requested are not kept forever.
+        self.snapshot = None
+        key = (self.project, self.strategy)
+        if _feeds.get(key) is self:
+            del _feeds[key]
+
+    def notify(self, task_ids):
+        """Record changed task ids; safe to call from any thread"""
+        if not self.subscribers or self.loop is None:
+            return
+        with self._lock:
+            self._pending.update(task_ids)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._schedule_flush)
+        except RuntimeError:
+            # The serving loop has shut down; there is no one left to tell
+            with self._lock:
+                self._flush_scheduled = False
+
+    def _schedule_flush(self):
+        self.loop.call_later(COALESCE_WINDOW, lambda: self.loop.create_task(self.flush()))
+
+    async def check_version(self):
+        """Refresh if another process wrote to this project's tasks"""
+        version = await sync_to_async(TableVersion.current)(task_version_key(self.project))
+        if self.snapshot is not None and version != self.version:
+            await self.flush()
+
+    async def flush(self):
+        with self._lock:
+            touched, self._pending = self._pending, set()
+            self._flush_scheduled = False
+        if not self.subscribers:
+            return
+
+        # Serialise refreshes so a version-poll refresh and a coalesced
+        # flush never diff against the same stale snapshot.
+        async with self._refreshing:
+            ranking, version = await sync_to_async(compute_ranking)(self.strategy, self.project)
+            diff = diff_rankings(self.snapshot or {}, ranking, touched)
+            self.snapshot, self.version = ranking, version
+        if not diff['changed'] and not diff['removed']:
+            return
+
+        self.sequence += 1
+        event = (self.sequence, diff)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind to catch up; EventSource will reconnect
+                # and start again from a fresh snapshot.
+                self.subscribers.discard(queue)
+
+
+# Feeds with subscribers, keyed by (project, strategy)
+_feeds = {}
+
+
+def get_feed(strategy, project=DEFAULT_PROJECT):
+    key = (project, strategy)
+    if key not in _feeds:
+        _feeds[key] = RankingFeed(strategy, project)
+    return _feeds[key]
+
+
+def notify_ranking_change(task_ids, project=DEFAULT_PROJECT):
+    """Tell the project's live feeds which tasks changed once the write has committed"""
+    feeds = [feed for (feed_project, _), feed in list(_feeds.items()) if feed_project == project]
+    if not any(feed.subscribers for feed in feeds):
+        return
+    task_ids = set(task_ids)
+
+    def publish():
+        for feed in feeds:
+            feed.notify(task_ids)
+
+    transaction.on_commit(publish)
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def stream_ranking_events(strategy, project=DEFAULT_PROJECT):
+    """Async iterator of SSE frames for one subscriber"""
+    # Looked up here rather than by the view so that no other stream can
+    # release the feed between the lookup and subscribe()
+    feed = get_feed(strategy, project)
+    queue, snapshot = await feed.subscribe()
+    try:
+        yield format_event('ranking', {
+            'project': feed.project,
+            'strategy': feed.strategy,
+            'tasks': [
+                {'id': task_id, 'rank': rank, 'score': score, 'priority_level': level}
+                for task_id, (rank, score, level) in sorted(snapshot.items(), key=lambda item: item[1][0])
+            ],
+        }, feed.sequence)
+        while True:
+            try:
+                sequence, diff = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                if queue not in feed.subscribers:
+                    return
+                yield ': keep-alive\n\n'
+                await feed.check_version()
+                continue
+            yield format_event('ranking-diff', diff, sequence)
+    finally:
+        feed.unsubscribe(queue)
@@ -0,0 +1,121 @@
+"""
+Worker cold-start and per-request overhead for one or more settings
+profiles.
+
+Each run starts a fresh interpreter, builds the WSGI application, serves
+one request and then a burst of warm requests straight through the WSGI
+callable (no sockets), so the numbers isolate Django start-up, installed
+apps, middleware and renderer cost from the network.
+
+    python manage.py coldstart --profiles task_analyzer.settings task_analyzer.settings_api
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PROFILES = ['task_analyzer.settings', 'task_analyzer.settings_api']
+
+# Runs in the child interpreter as ``-c CHILD <path> <requests>``; prints
+# one JSON line
+CHILD = r'''
+import io, json, sys, time
+started = time.perf_counter()
+PATH, REQUESTS = sys.argv[1], int(sys.argv[2])
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+
+def call(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'HTTP_ACCEPT': 'application/json', 'wsgi.input': io.BytesIO(),
+        'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+    }
+    status = []
+    body = b''.join(application(environ, lambda s, h, e=None: status.append(s)))
+    return status[0], body
+
+status, _ = call(PATH)
+first = time.perf_counter()
+modules = len(sys.modules)
+scorer_loaded = 'tasks.scoring' in sys.modules
+
+samples = []
+for _ in range(REQUESTS):
+    start = time.perf_counter()
+    call(PATH)
+    samples.append(time.perf_counter() - start)
+samples.sort()
+print(json.dumps({
+    'status': status,
+    'setup_ms': (ready - started) * 1000,
+    'first_request_ms': (first - ready) * 1000,
+    'modules_loaded': modules,
+    'scorer_loaded': scorer_loaded,
+    'request_us_p50': samples[len(samples) // 2] * 1e6,
+    'request_us_mean': sum(samples) / len(samples) * 1e6,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure worker cold-start time and per-request overhead for each settings profile as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=DEFAULT_PROFILES,
+                            help='Settings modules to compare')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Fresh worker processes per profile')
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Warm requests per worker')
+        parser.add_argument('--path', default='/api/health/',
+                            help='Endpoint to request (should not need the database)')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1 or options['requests'] < 1:
+            raise CommandError('--runs and --requests must be positive')
+
+        report = {
+            'config': {key: options[key] for key in ('runs', 'requests', 'path')},
+            'results': {},
+        }
+        for profile in options['profiles']:
+            runs = [self.run_worker(profile, options) for _ in range(options['runs'])]
+            report['results'][profile] = self.aggregate(runs)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run_worker(self, profile, options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile, PYTHONDONTWRITEBYTECODE='1')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD, options['path'], str(options['requests'])],
+            env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True
+        )
+        if result.returncode:
+            raise CommandError(f'{profile} worker failed:\n{result.stderr.strip()}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def aggregate(self, runs):
+        def median(key):
+            return round(statistics.median(run[key] for run in runs), 1)
+
+        return {
+            'status': runs[0]['status'],
+            'setup_ms': median('setup_ms'),
+            'first_request_ms': median('first_request_ms'),
+            'cold_start_ms': round(statistics.median(
+                run['setup_ms'] + run['first_request_ms'] for run in runs
+            ), 1),
+            'modules_loaded': runs[0]['modules_loaded'],
+            'scorer_loaded_after_first_request': runs[0]['scorer_loaded'],
+            'request_us_p50': median('request_us_p50'),
+            'request_us_mean': median('request_us_mean'),
+        }
@@ -0,0 +1,57 @@
+"""
+Stream every stored task to CSV or JSONL.
+
+    python manage.py export_tasks --output tasks.csv
+    python manage.py export_tasks --project backend --format jsonl > tasks.jsonl
+"""
+
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import DEFAULT_PROJECT
+from tasks.transfer import FORMATS, export_tasks
+
+
+def infer_format(path, file_format):
+    """Explicit ``--format`` wins, otherwise go by the file extension"""
+    if file_format:
+        return file_format
+    extension = os.path.splitext(path or '')[1].lstrip('.').lower()
+    if extension == 'ndjson':
+        extension = 'jsonl'
+    if extension in FORMATS:
+        return extension
+    if path and path != '-':
+        raise CommandError(f'Cannot infer the format of {path!r}; pass --format')
+    return 'csv'
+
+
+class Command(BaseCommand):
+    help = 'Export stored tasks and their dependencies as CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Output format (default: from --output extension, else csv)')
+        parser.add_argument('--project', default=DEFAULT_PROJECT,
+                            help=f'Project to export (default: {DEFAULT_PROJECT})')
+        parser.add_argument('--output', default='-',
+                            help="File to write, or '-' for stdout (default)")
+
+    def handle(self, *args, **options):
+        file_format = infer_format(options['output'], options['format'])
+        if options['output'] == '-':
+            self.write_rows(sys.stdout, file_format, options['project'])
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as fh:
+            count = self.write_rows(fh, file_format, options['project'])
+        self.stderr.write(f'Exported {count} tasks to {options["output"]}')
+
+    def write_rows(self, fh, file_format, project):
+        count = 0
+        for chunk in export_tasks(file_format, project=project):
+            fh.write(chunk)
+            count += 1
+        # The CSV header is not a task
+        return count - 1 if file_format == 'csv' else count
@@ -0,0 +1,50 @@
+"""
+Bulk-load tasks from a CSV or JSONL file and print a JSON summary.
+
+    python manage.py import_tasks tasks.csv
+    cat tasks.jsonl | python manage.py import_tasks - --format jsonl --project backend
+"""
+
+import json
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import DEFAULT_PROJECT, clean_project
+from tasks.transfer import FORMATS, IMPORT_BATCH_SIZE, import_tasks
+from .export_tasks import infer_format
+
+
+class Command(BaseCommand):
+    help = 'Import tasks and their dependencies from CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or '-' for stdin")
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Input format (default: from the file extension, else csv)')
+        parser.add_argument('--project', default=DEFAULT_PROJECT,
+                            help=f'Project to import into (default: {DEFAULT_PROJECT})')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Rows inserted per transaction')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        file_format = infer_format(options['path'], options['format'])
+        try:
+            clean_project(options['project'])
+        except ValidationError:
+            raise CommandError(f'Invalid project name: {options["project"]!r}')
+        kwargs = {'batch_size': options['batch_size'], 'project': options['project']}
+
+        if options['path'] == '-':
+            summary = import_tasks(sys.stdin, file_format, **kwargs)
+        else:
+            try:
+                fh = open(options['path'], newline='', encoding='utf-8')
+            except OSError as exc:
+                raise CommandError(f'Cannot read {options["path"]}: {exc.strerror}')
+            with fh:
+                summary = import_tasks(fh, file_format, **kwargs)
+        self.stdout.write(json.dumps(summary, indent=2))
@@ -0,0 +1,431 @@
+"""
+Local HTTP load test for the Task Analyzer API.
+
+Starts the project behind a WSGI server (Django's threaded WSGI server)
+and/or an ASGI server (uvicorn, if installed), each in its own child
+process with its own throwaway database so the servers share neither the
+client's GIL nor each other's rows, drives a weighted mix of API calls at
+it from a pool of client threads and prints throughput, latency
+percentiles and error rates as JSON.
+
+    python manage.py loadtest --server both --concurrency 16 --requests 2000
+"""
+
+import http.client
+import importlib.util
+import json
+import math
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+DEFAULT_MIX = 'analyze=3,suggest=2,crud=3,health=2'
+
+# Runs in the WSGI child as ``-c WSGI_CHILD <host> <port>``. Unlike
+# runserver's handler this one disables Nagle: it writes headers and body
+# separately, so every response on a kept-alive connection would otherwise
+# stall ~40 ms on the client's delayed ACK.
+WSGI_CHILD = r'''
+import sys
+import django
+django.setup()
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+)
+
+class Handler(WSGIRequestHandler):
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+httpd = ThreadedWSGIServer((sys.argv[1], int(sys.argv[2])), Handler)
+httpd.set_app(get_internal_wsgi_application())
+httpd.serve_forever()
+'''
+
+
+def generate_tasks(count, rng, id_prefix='t'):
+    """
+    Synthetic analysis payload: ``count`` tasks with random due dates,
+    importance and effort, each depending on up to two earlier tasks so
+    the graph stays acyclic.
+    """
+    today = date.today()
+    tasks = []
+    for idx in range(count):
+        dependencies = []
+        if idx:
+            dependencies = [
+                f'{id_prefix}{rng.randrange(idx)}'
+                for _ in range(rng.randint(0, min(2, idx)))
+            ]
+        tasks.append({
+            'id': f'{id_prefix}{idx}',
+            'title': f'Synthetic task {idx}',
+            'due_date': (today + timedelta(days=rng.randint(-5, 30))).isoformat(),
+            'estimated_hours': rng.choice([0.5, 1, 2, 3, 5, 8, 13]),
+            'importance': rng.randint(1, 10),
+            'dependencies': sorted(set(dependencies)),
+        })
+    return tasks
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """Aggregate ``(endpoint, latency_s, ok)`` samples into a report"""
+    def stats(rows):
+        latencies = sorted(latency * 1000 for _, latency, _ in rows)
+        errors = sum(1 for _, _, ok in rows if not ok)
+        return {
+            'requests': len(rows),
+            'errors': errors,
+            'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+            'latency_ms': {
+                'p50': _round(percentile(latencies, 50)),
+                'p95': _round(percentile(latencies, 95)),
+                'p99': _round(percentile(latencies, 99)),
+                'mean': _round(statistics.fmean(latencies)) if latencies else None,
+                'max': _round(latencies[-1]) if latencies else None,
+            },
+        }
+
+    by_endpoint = {}
+    for row in samples:
+        by_endpoint.setdefault(row[0], []).append(row)
+
+    report = stats(samples)
+    report['duration_s'] = round(elapsed, 3)
+    report['throughput_rps'] = round(len(samples) / elapsed, 1) if elapsed else None
+    report['endpoints'] = {name: stats(rows) for name, rows in sorted(by_endpoint.items())}
+    return report
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def _free_port(host):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class _ServerProcess:
+    """A deployment running in a child interpreter under ``settings_module``"""
+
+    label = None
+
+    def __init__(self, host, port, settings_module, workdir):
+        self.host = host
+        self.port = port
+        self.settings_module = settings_module
+        self.workdir = workdir
+        self.log_path = os.path.join(workdir, f'{self.label}.log')
+        self.process = None
+
+    @classmethod
+    def check_available(cls):
+        """Raise ImportError if the server is not installed"""
+
+    def command(self):
+        raise NotImplementedError
+
+    def start(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=self.settings_module)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [
+            self.workdir, str(settings.BASE_DIR), env.get('PYTHONPATH')
+        ]))
+        # Server logs go to a file: a full stderr pipe would stall the server
+        with open(self.log_path, 'wb') as log:
+            self.process = subprocess.Popen(
+                self.command(), env=env, cwd=settings.BASE_DIR,
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT
+            )
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection((self.host, self.port), timeout=1).close()
+                return
+            except OSError:
+                pass
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                with open(self.log_path, errors='replace') as log:
+                    output = log.read().strip()
+                raise CommandError(f'{self.label.upper()} server failed to start:\n{output}')
+            time.sleep(0.05)
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class _WSGIServer(_ServerProcess):
+    label = 'wsgi'
+
+    def command(self):
+        return [sys.executable, '-c', WSGI_CHILD, self.host, str(self.port)]
+
+
+class _ASGIServer(_ServerProcess):
+    label = 'asgi'
+
+    @classmethod
+    def check_available(cls):
+        if importlib.util.find_spec('uvicorn') is None:
+            raise ImportError('uvicorn is not installed', name='uvicorn')
+
+    def command(self):
+        return [
+            sys.executable, '-m', 'uvicorn', 'task_analyzer.asgi:application',
+            '--host', self.host, '--port', str(self.port),
+            '--log-level', 'warning', '--no-access-log', '--lifespan', 'off',
+        ]
+
+
+class _Client:
+    """One keep-alive connection plus the state a worker needs for CRUD calls"""
+
+    def __init__(self, host, port, rng, payloads, created, lock):
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.rng = rng
+        self.payloads = payloads
+        self.created = created
+        self.lock = lock
+
+    def request(self, method, path, body=None):
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.conn.request(method, path, body=data, headers=headers)
+            response = self.conn.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            return None, None
+        if response.getheader('Connection', '').lower() == 'close':
+            self.conn.close()
+        return response.status, payload
+
+    def call(self, kind):
+        """Issue one request of the given mix kind; returns (endpoint, ok)"""
+        if kind == 'analyze':
+            status, _ = self.request('POST', '/api/tasks/analyze/', self.rng.choice(self.payloads))
+            return 'POST /api/tasks/analyze/', status == 200
+        if kind == 'suggest':
+            status, _ = self.request('POST', '/api/tasks/suggest/', self.rng.choice(self.payloads))
+            return 'POST /api/tasks/suggest/', status == 200
+        if kind == 'health':
+            status, _ = self.request('GET', '/api/health/')
+            return 'GET /api/health/', status == 200
+        return self.crud()
+
+    def crud(self):
+        with self.lock:
+            known = list(self.created)
+        op = self.rng.choice(['list', 'create', 'retrieve', 'update', 'delete'])
+        if not known and op != 'list':
+            op = 'create'
+
+        if op == 'list':
+            status, _ = self.request('GET', '/api/tasks/?page_size=50')
+            return 'GET /api/tasks/', status == 200
+        if op == 'create':
+            body = {
+                'title': 'Load test task',
+                'due_date': (date.today() + timedelta(days=self.rng.randint(0, 30))).isoformat(),
+                'estimated_hours': self.rng.choice([0.5, 1, 2, 4]),
+                'importance': self.rng.randint(1, 10),
+            }
+            status, payload = self.request('POST', '/api/tasks/', body)
+            if status == 201:
+                with self.lock:
+                    self.created.append(json.loads(payload)['id'])
+            return 'POST /api/tasks/', status == 201
+
+        task_id = self.rng.choice(known)
+        if op == 'retrieve':
+            status, _ = self.request('GET', f'/api/tasks/{task_id}/')
+            return 'GET /api/tasks/{id}/', status in (200, 404)
+        if op == 'update':
+            status, _ = self.request(
+                'PATCH', f'/api/tasks/{task_id}/', {'importance': self.rng.randint(1, 10)}
+            )
+            return 'PATCH /api/tasks/{id}/', status in (200, 404)
+
+        with self.lock:
+            if task_id not in self.created:
+                return 'DELETE /api/tasks/{id}/', True
+            self.created.remove(task_id)
+        status, _ = self.request('DELETE', f'/api/tasks/{task_id}/')
+        return 'DELETE /api/tasks/{id}/', status == 204
+
+
+class Command(BaseCommand):
+    help = 'Drive a concurrent request mix at a local WSGI/ASGI server and report latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['wsgi', 'asgi', 'both'], default='both',
+                            help='Deployment(s) to start and measure (ASGI needs uvicorn)')
+        parser.add_argument('--concurrency', type=int, default=16,
+                            help='Number of concurrent client connections')
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Total requests per server')
+        parser.add_argument('--tasks', type=int, default=50,
+                            help='Tasks per analyze/suggest payload')
+        parser.add_argument('--payloads', type=int, default=20,
+                            help='Number of distinct synthetic payloads to rotate through')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help=f'Weighted request mix (default: {DEFAULT_MIX})')
+        parser.add_argument('--warmup', type=int, default=50,
+                            help='Unmeasured requests issued before measuring')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        if options['concurrency'] < 1 or options['requests'] < 1 or options['tasks'] < 1:
+            raise CommandError('--concurrency, --requests and --tasks must be positive')
+
+        rng = random.Random(options['seed'])
+        payloads = [
+            {'tasks': generate_tasks(options['tasks'], rng), 'strategy': rng.choice(['smart', 'fastest', 'impact', 'deadline'])}
+            for _ in range(options['payloads'])
+        ]
+
+        servers = ['wsgi', 'asgi'] if options['server'] == 'both' else [options['server']]
+        report = {
+            'config': {
+                key: options[key]
+                for key in ('concurrency', 'requests', 'tasks', 'payloads', 'mix', 'warmup', 'seed')
+            },
+            'results': {},
+        }
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for label in servers:
+                try:
+                    report['results'][label] = self.run_server(label, tmpdir, mix, payloads, options)
+                except ImportError as exc:
+                    report['results'][label] = {'skipped': f'{exc.name} is not installed'}
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        self.stdout.write(output)
+
+    def parse_mix(self, spec):
+        mix = {}
+        for part in spec.split(','):
+            name, _, weight = part.partition('=')
+            name = name.strip()
+            if name not in ('analyze', 'suggest', 'crud', 'health'):
+                raise CommandError(f'Unknown mix entry: {name!r}')
+            try:
+                mix[name] = int(weight or 1)
+            except ValueError:
+                raise CommandError(f'Invalid weight for {name!r}: {weight!r}')
+        if not any(mix.values()):
+            raise CommandError('--mix needs at least one positive weight')
+        return mix
+
+    def use_database(self, workdir, label):
+        """
+        Migrate a fresh database for ``label`` in ``workdir`` and write a
+        settings module beside it that points the current settings at it;
+        returns the module name for that server's process. Every run
+        writes to its own throwaway database, never the configured one.
+        """
+        path = os.path.join(workdir, f'loadtest_{label}.sqlite3')
+        module = f'loadtest_settings_{label}'
+        connections.close_all()
+        connections['default'].settings_dict['NAME'] = path
+        call_command('migrate', verbosity=0, interactive=False)
+        connections.close_all()
+
+        with open(os.path.join(workdir, f'{module}.py'), 'w') as fh:
+            fh.write(
+                f'from {settings.SETTINGS_MODULE} import *  # noqa: F401,F403\n'
+                f'from {settings.SETTINGS_MODULE} import DATABASES\n\n'
+                f"DATABASES = {{**DATABASES, 'default': {{**DATABASES['default'], 'NAME': {path!r}}}}}\n"
+            )
+        return module
+
+    def run_server(self, label, workdir, mix, payloads, options):
+        host = '127.0.0.1'
+        port = _free_port(host)
+        server_class = _WSGIServer if label == 'wsgi' else _ASGIServer
+        server_class.check_available()
+        server = server_class(host, port, self.use_database(workdir, label), workdir)
+        server.start()
+        try:
+            return self.drive(host, port, mix, payloads, options)
+        finally:
+            server.stop()
+
+    def drive(self, host, port, mix, payloads, options):
+        kinds = [kind for kind, weight in mix.items() for _ in range(weight)]
+        created, lock = [], threading.Lock()
+        samples = []
+
+        def worker(worker_id, count, record):
+            client = _Client(
+                host, port, random.Random(options['seed'] * 1000 + worker_id),
+                payloads, created, lock
+            )
+            rows = []
+            for _ in range(count):
+                kind = client.rng.choice(kinds)
+                start = time.perf_counter()
+                endpoint, ok = client.call(kind)
+                rows.append((endpoint, time.perf_counter() - start, ok))
+            client.conn.close()
+            if record:
+                with lock:
+                    samples.extend(rows)
+
+        def run(total, record):
+            concurrency = options['concurrency']
+            shares = [total // concurrency + (1 if i < total % concurrency else 0)
+                      for i in range(concurrency)]
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = [pool.submit(worker, i, share, record)
+                           for i, share in enumerate(shares) if share]
+                for future in futures:
+                    future.result()
+
+        if options['warmup']:
+            run(options['warmup'], record=False)
+        started = time.perf_counter()
+        run(options['requests'], record=True)
+        return summarize(samples, time.perf_counter() - started)
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at'], name='task_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date', 'importance'], name='task_due_importance_idx'),
+        ),
+        # Covering index for the reverse side of the dependencies M2M so
+        # "which tasks depend on X" lookups are answered from the index alone.
+        migrations.RunSQL(
+            sql='CREATE INDEX "tasks_task_dependencies_to_from_idx" '
+                'ON "tasks_task_dependencies" ("to_task_id", "from_task_id");',
+            reverse_sql='DROP INDEX "tasks_task_dependencies_to_from_idx";',
+        ),
+    ]
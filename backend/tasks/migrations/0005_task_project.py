@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_tableversion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_created_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_due_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_due_importance_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='project',
+            field=models.SlugField(db_index=False, default='default', help_text='Project/workspace the task belongs to; dependencies stay within it', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'created_at'], name='task_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'due_date', 'importance'], name='task_project_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'topo_order'], name='task_project_topo_idx'),
+        ),
+    ]
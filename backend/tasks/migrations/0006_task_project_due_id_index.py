@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_project'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_project_due_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'due_date', 'id'], name='task_project_due_idx'),
+        ),
+    ]
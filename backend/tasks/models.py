@@ -1,13 +1,24 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Case, F, Max, Value, When
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 
+from .topology import CycleError, reorder_for_edge
+
+DEFAULT_PROJECT = 'default'
+
 
 class Task(models.Model):
     """
     Task model for storing task information.
     Each task can have dependencies on other tasks.
     """
+    project = models.SlugField(
+        max_length=64,
+        default=DEFAULT_PROJECT,
+        db_index=False,
+        help_text="Project/workspace the task belongs to; dependencies stay within it"
+    )
     title = models.CharField(max_length=200)
     due_date = models.DateField()
     estimated_hours = models.FloatField(
@@ -25,17 +36,39 @@ class Task(models.Model):
         blank=True,
         help_text="Tasks that must be completed before this task"
     )
+    topo_order = models.IntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Position in a topological order of the dependency graph"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        # Every listing, ranking and export is filtered by project first
+        indexes = [
+            models.Index(fields=['project', 'created_at'], name='task_project_created_idx'),
+            models.Index(fields=['project', 'due_date', 'id'], name='task_project_due_idx'),
+            models.Index(fields=['project', 'topo_order'], name='task_project_topo_idx'),
+        ]
         verbose_name = 'Task'
         verbose_name_plural = 'Tasks'
 
     def __str__(self):
         return f"{self.title} (Due: {self.due_date})"
 
+    def save(self, *args, **kwargs):
+        # New tasks have no edges yet, so the end of the order is always valid
+        if self._state.adding and not self.topo_order:
+            self.topo_order = Task.next_topo_order()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def next_topo_order(cls):
+        return (cls.objects.aggregate(top=Max('topo_order'))['top'] or 0) + 1
+
     def clean(self):
         """Validate task data"""
         super().clean()
@@ -58,13 +91,262 @@ class Task(models.Model):
         """Count how many tasks depend on this task"""
         return self.dependent_tasks.count()
 
+    def check_new_dependencies(self, dependencies):
+        """
+        Raise ValidationError if any of these tasks is in another project
+        or depending on it would create a cycle
+        """
+        check_same_project(self.project, dependencies)
+        if self.pk is None:
+            # Nothing can depend on an unsaved task yet
+            return
+        existing = set(self.dependencies.values_list('id', flat=True))
+        for dependency in dependencies:
+            dependency_id = getattr(dependency, 'pk', dependency)
+            if dependency_id in existing:
+                continue
+            try:
+                plan_dependency_edge(dependency_id, self.pk)
+            except CycleError as exc:
+                raise ValidationError({'dependencies': str(exc)})
+
+    def get_transitive_dependencies(self, max_depth=None):
+        """Get every task this task waits on, directly or indirectly, and whether the walk was cut short"""
+        return walk_dependency_graph(self.pk, 'dependencies', max_depth)
+
+    def get_transitive_dependents(self, max_depth=None):
+        """Get every task waiting on this task, directly or indirectly, and whether the walk was cut short"""
+        return walk_dependency_graph(self.pk, 'dependents', max_depth)
+
     def to_dict(self):
         """Convert task to dictionary representation"""
         return {
             'id': self.id,
+            'project': self.project,
             'title': self.title,
             'due_date': self.due_date.isoformat(),
             'estimated_hours': float(self.estimated_hours),
             'importance': self.importance,
-            'dependencies': list(self.dependencies.values_list('id', flat=True))
-        }
\ No newline at end of file
+            # Iterate .all() so a prefetch_related('dependencies') cache is used
+            'dependencies': [dep.pk for dep in self.dependencies.all()]
+        }
+
+
+class TableVersion(models.Model):
+    """
+    Monotonic write counter per table, used to build cheap ETags.
+
+    Bumped on every write to the table it names, so a conditional GET can
+    be answered from this single row without running the real query.
+    """
+    table = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+    @classmethod
+    def current(cls, table):
+        return cls.objects.filter(table=table).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, table):
+        if not cls.objects.filter(table=table).update(version=F('version') + 1):
+            cls.objects.get_or_create(table=table)
+            cls.objects.filter(table=table).update(version=F('version') + 1)
+
+
+def task_version_key(project=None):
+    """TableVersion key for the whole task table, or for one project's slice of it"""
+    table = Task._meta.db_table
+    return table if project is None else f'{table}:{project}'
+
+
+def clean_project(value):
+    """Return ``value`` if it is a valid project name, else raise ValidationError"""
+    return Task._meta.get_field('project').clean(value, None)
+
+
+def check_same_project(project, dependencies):
+    """Raise ValidationError unless every dependency (task or pk) is in ``project``"""
+    ids = [dep for dep in dependencies if not isinstance(dep, Task)]
+    projects = {dep.project for dep in dependencies if isinstance(dep, Task)}
+    if ids:
+        projects.update(Task.objects.filter(pk__in=ids).values_list('project', flat=True).distinct())
+    if projects - {project}:
+        raise ValidationError({
+            'dependencies': f"Dependencies must belong to the same project ({project!r})"
+        })
+
+
+MAX_TRAVERSAL_DEPTH = 100
+# Walks up to this deep are bounded in SQL; deeper ones collect the whole
+# reachable set once (see walk_dependency_graph)
+BOUNDED_WALK_DEPTH = 8
+
+
+def walk_dependency_graph(task_id, direction, max_depth=None):
+    """
+    Walk the dependency graph from ``task_id`` in a single recursive CTE.
+
+    ``direction`` is ``'dependencies'`` (tasks blocking this one) or
+    ``'dependents'`` (tasks blocked by this one). Returns ``(tasks,
+    truncated)``: one dict per task within ``max_depth`` steps, with its
+    shortest ``depth`` and one shortest ``path`` of ids from ``task_id``
+    to it, ordered by depth then id; ``truncated`` is true when further
+    tasks are reachable beyond ``max_depth``.
+
+    The CTE collects the tasks to expand and the statement returns the
+    edges leaving them; depths and paths come from a breadth-first search
+    over those edges in Python. A shallow walk carries the depth so the
+    SQL stops at ``max_depth`` (one edge further shows truncation), but a
+    task reachable by paths of many lengths appears once per length, so
+    deep walks instead collect the whole reachable set with UNION on the
+    task id alone, visiting each task and edge once.
+    """
+    if max_depth is None:
+        max_depth = MAX_TRAVERSAL_DEPTH
+    max_depth = max(1, min(int(max_depth), MAX_TRAVERSAL_DEPTH))
+
+    through = Task.dependencies.through
+    if direction == 'dependencies':
+        start_col, next_col = 'from_task_id', 'to_task_id'
+    elif direction == 'dependents':
+        start_col, next_col = 'to_task_id', 'from_task_id'
+    else:
+        raise ValueError(f"Invalid direction: {direction}")
+
+    if max_depth <= BOUNDED_WALK_DEPTH:
+        reach = f"""
+            reach(task_id, depth) AS (
+                SELECT %s, 0
+                UNION
+                SELECT e.{next_col}, r.depth + 1
+                FROM reach r
+                JOIN {through._meta.db_table} e ON e.{start_col} = r.task_id
+                WHERE r.depth < %s
+            ),
+            expanded(task_id) AS (SELECT DISTINCT task_id FROM reach)
+        """
+        params = [task_id, max_depth]
+    else:
+        reach = f"""
+            expanded(task_id) AS (
+                SELECT %s
+                UNION
+                SELECT e.{next_col}
+                FROM expanded r
+                JOIN {through._meta.db_table} e ON e.{start_col} = r.task_id
+            )
+        """
+        params = [task_id]
+    sql = f"""
+        WITH RECURSIVE {reach}
+        SELECT e.{start_col}, e.{next_col},
+               t.title, t.due_date, t.importance, t.estimated_hours
+        FROM expanded r
+        JOIN {through._meta.db_table} e ON e.{start_col} = r.task_id
+        JOIN {Task._meta.db_table} t ON t.id = e.{next_col}
+        ORDER BY e.{start_col}, e.{next_col}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    edges, details = {}, {}
+    for source, target, *fields in rows:
+        edges.setdefault(source, []).append(target)
+        details[target] = fields
+
+    parents = {task_id: None}
+    levels = []
+    frontier = [task_id]
+    truncated = False
+    while frontier:
+        reached = sorted({
+            target for node in frontier for target in edges.get(node, ())
+            if target not in parents
+        })
+        if reached and len(levels) == max_depth:
+            truncated = True
+            break
+        for node in frontier:
+            for target in edges.get(node, ()):
+                parents.setdefault(target, node)
+        if reached:
+            levels.append(reached)
+        frontier = reached
+
+    def path_to(node_id):
+        path = [node_id]
+        while path[-1] != task_id:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
+
+    due_date_field = Task._meta.get_field('due_date')
+    tasks = []
+    for depth, level in enumerate(levels, 1):
+        for node_id in level:
+            title, due_date, importance, estimated_hours = details[node_id]
+            tasks.append({
+                'id': node_id,
+                'title': title,
+                'due_date': due_date_field.to_python(due_date).isoformat(),
+                'importance': importance,
+                'estimated_hours': float(estimated_hours),
+                'depth': depth,
+                'path': path_to(node_id),
+            })
+    return tasks, truncated
+
+
+def _dependents_within(frontier, upper):
+    """Tasks depending on any task in ``frontier`` with topo_order <= upper"""
+    return dict(
+        Task.dependencies.through.objects
+        .filter(to_task_id__in=frontier, from_task__topo_order__lte=upper)
+        .values_list('from_task_id', 'from_task__topo_order')
+    )
+
+
+def _dependencies_within(frontier, lower):
+    """Tasks that any task in ``frontier`` depends on with topo_order >= lower"""
+    return dict(
+        Task.dependencies.through.objects
+        .filter(from_task_id__in=frontier, to_task__topo_order__gte=lower)
+        .values_list('to_task_id', 'to_task__topo_order')
+    )
+
+
+def plan_dependency_edge(dependency_id, dependent_id):
+    """
+    Work out how the stored topological order has to change for
+    ``dependent_id`` to start depending on ``dependency_id``.
+
+    Returns ``{task_id: new_topo_order}`` and raises ``CycleError`` if the
+    dependency would close a cycle. Only tasks ordered between the two
+    endpoints are ever queried.
+    """
+    order = dict(
+        Task.objects.filter(pk__in=[dependency_id, dependent_id])
+        .values_list('id', 'topo_order')
+    )
+    return reorder_for_edge(
+        dependency_id, dependent_id, order,
+        successors=_dependents_within,
+        predecessors=_dependencies_within
+    )
+
+
+def add_dependency_edge(dependency_id, dependent_id):
+    """Reorder the affected tasks for a new dependency edge, or raise CycleError"""
+    with transaction.atomic():
+        moves = plan_dependency_edge(dependency_id, dependent_id)
+        if moves:
+            Task.objects.filter(pk__in=moves).update(
+                topo_order=Case(
+                    *[When(pk=pk, then=Value(order)) for pk, order in moves.items()],
+                    output_field=models.IntegerField()
+                )
+            )
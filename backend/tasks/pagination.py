@@ -0,0 +1,159 @@
+"""
+Keyset (cursor) pagination for the task list API.
+
+Pages are addressed by the sort key of the last row seen rather than by an
+OFFSET, and no COUNT(*) is issued, so every page costs the same index range
+scan no matter how deep into the table a client has walked.
+"""
+
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Cursor pagination over a unique ``(field, id)`` key.
+
+    Supported orderings are ``created_at`` and ``due_date``, ascending or
+    descending (``?ordering=-due_date``). ``id`` is always appended as the
+    tie-breaker so the key is unique and pages never skip or repeat rows.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    page_size = api_settings.PAGE_SIZE or 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    ORDERING_FIELDS = ('created_at', 'due_date')
+    default_ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+
+        cursor = self.decode_cursor(request, queryset.model)
+        # Walking backwards means flipping the sort and reversing the page
+        reverse = cursor is not None and cursor['reverse']
+        scan_descending = descending != reverse
+
+        if scan_descending:
+            queryset = queryset.order_by(f'-{field}', '-id')
+        else:
+            queryset = queryset.order_by(field, 'id')
+
+        if cursor is not None:
+            strict, bound = ('lt', 'lte') if scan_descending else ('gt', 'gte')
+            # The separate inclusive bound gives the planner a range on the
+            # sort column; the OR alone would be a filter over a full scan.
+            queryset = queryset.filter(**{f'{field}__{bound}': cursor['value']}).filter(
+                Q(**{f'{field}__{strict}': cursor['value']})
+                | Q(**{f'id__{strict}': cursor['id']})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_param, self.default_ordering)
+        if ordering.lstrip('-') not in self.ORDERING_FIELDS:
+            return self.default_ordering
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            # A cursor only makes sense for the ordering it was issued under
+            if payload['o'] != self.ordering:
+                raise ValueError(payload['o'])
+            field = model._meta.get_field(self.ordering.lstrip('-'))
+            return {
+                'value': field.to_python(payload['v']),
+                'id': int(payload['i']),
+                'reverse': bool(payload.get('r', False)),
+            }
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    def encode_cursor(self, instance, reverse):
+        field = self.ordering.lstrip('-')
+        payload = {
+            'o': self.ordering,
+            'v': getattr(instance, field).isoformat(),
+            'i': instance.pk,
+        }
+        if reverse:
+            payload['r'] = 1
+        encoded = b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
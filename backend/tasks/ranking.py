@@ -0,0 +1,43 @@
+"""
+Cached rankings of stored tasks, one per project.
+
+Every project has its own ``TableVersion`` counter, bumped by writes to
+its tasks and their dependency edges. A ranking is cached under that
+counter, so a write only invalidates the rankings of its own project:
+reading a project whose counter has not moved costs one version lookup,
+however large the rest of the table is.
+"""
+
+from django.core.cache import cache
+
+from .models import TableVersion, Task, task_version_key
+
+RANKING_CACHE_TIMEOUT = 300
+
+
+def project_tasks(project):
+    """The project's stored tasks as scorer input dicts"""
+    return [
+        task.to_dict()
+        for task in Task.objects.filter(project=project).prefetch_related('dependencies')
+    ]
+
+
+def rank_project(scorer, project, forecast=False):
+    """
+    The project's stored tasks scored and sorted by ``scorer``; returns
+    ``(scored_tasks, version)``.
+    """
+    version = TableVersion.current(task_version_key(project))
+    # Versions only grow, so keys for older versions are never read again
+    # and simply age out of the cache.
+    key = f'task-ranking:{project}:{version}:{scorer.strategy}:{scorer.as_of}:{forecast}'
+    scored = cache.get(key)
+    if scored is None:
+        # Stored dependencies are acyclic; components unchanged since the
+        # last version still come from the per-component cache.
+        scored = scorer.score_and_sort_tasks(
+            project_tasks(project), check_cycles=False, forecast=forecast, cache=cache
+        )
+        cache.set(key, scored, RANKING_CACHE_TIMEOUT)
+    return scored, version
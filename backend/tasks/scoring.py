@@ -2,8 +2,125 @@
 Priority Scoring Algorithm for Task Analysis
 """
 
-from datetime import datetime, date
-from typing import List, Dict, Any, Tuple
+import hashlib
+import heapq
+import json
+from array import array
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+
+class DependencyGraph:
+    """
+    Task dependencies interned to dense integers.
+    
+    Every task id (client string, DB integer or generated ``task_N``) is
+    normalised with ``str()`` and mapped to its position 0..n-1 once.
+    Dependencies are stored CSR-style: the dependencies of task ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]``. Unknown and repeated
+    dependency ids are dropped, so counting, cycle detection and ranking
+    work on small ints and only map back to external ids for output.
+    """
+    
+    __slots__ = ('ids', 'index', 'offsets', 'targets', 'blocking_counts')
+    
+    def __init__(self, tasks: List[Dict]):
+        self.ids = [task.get('id') for task in tasks]
+        self.index = {}
+        for position, task_id in enumerate(self.ids):
+            # Duplicate ids resolve to the first task carrying them
+            self.index.setdefault(str(task_id), position)
+        
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.blocking_counts = array('l', [0]) * len(tasks)
+        for task in tasks:
+            seen = set()
+            for dep_id in task.get('dependencies') or ():
+                target = self.index.get(str(dep_id))
+                if target is not None and target not in seen:
+                    seen.add(target)
+                    self.targets.append(target)
+                    self.blocking_counts[target] += 1
+            self.offsets.append(len(self.targets))
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def position(self, task_id: Any) -> Optional[int]:
+        return self.index.get(str(task_id))
+    
+    def blocking_count(self, task_id: Any) -> int:
+        """Tasks blocked by ``task_id`` (by its first carrier if duplicated)"""
+        position = self.position(task_id)
+        return self.blocking_counts[position] if position is not None else 0
+    
+    def dependencies_of(self, position: int) -> array:
+        return self.targets[self.offsets[position]:self.offsets[position + 1]]
+    
+    def components(self) -> List[List[int]]:
+        """
+        Weakly connected components as sorted lists of positions, ordered
+        by their first member. Union-find with union by size and path
+        halving, so this is near-linear in tasks + dependencies.
+        """
+        parent = list(range(len(self.ids)))
+        size = [1] * len(self.ids)
+        
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+        
+        for source in range(len(self.ids)):
+            for edge in range(self.offsets[source], self.offsets[source + 1]):
+                a, b = find(source), find(self.targets[edge])
+                if a == b:
+                    continue
+                if size[a] < size[b]:
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+        
+        groups = {}
+        for node in range(len(self.ids)):
+            groups.setdefault(find(node), []).append(node)
+        return list(groups.values())
+    
+    def has_cycle(self, roots: Iterable[int] = None, colour: bytearray = None) -> bool:
+        """
+        Iterative three-colour DFS over the CSR arrays. Pass a component's
+        members as ``roots`` to check only that component; checks of
+        disjoint components can share one ``colour`` array (from
+        ``new_colouring()``) instead of allocating one each.
+        """
+        offsets, targets = self.offsets, self.targets
+        if colour is None:
+            colour = self.new_colouring()
+        for root in (range(len(self.ids)) if roots is None else roots):
+            if colour[root]:
+                continue
+            colour[root] = 1
+            stack = [(root, offsets[root])]
+            while stack:
+                node, edge = stack[-1]
+                if edge == offsets[node + 1]:
+                    colour[node] = 2
+                    stack.pop()
+                    continue
+                stack[-1] = (node, edge + 1)
+                nxt = targets[edge]
+                if colour[nxt] == 1:
+                    return True
+                if colour[nxt] == 0:
+                    colour[nxt] = 1
+                    stack.append((nxt, offsets[nxt]))
+        return False
+    
+    def new_colouring(self) -> bytearray:
+        """Per-task DFS state for ``has_cycle``: 0 = unvisited, 1 = on the current path, 2 = finished"""
+        return bytearray(len(self.ids))
 
 
 class TaskPriorityScorer:
@@ -16,6 +133,16 @@ class TaskPriorityScorer:
     EFFORT_MAX = 15
     DEPENDENCY_MAX = 15
     
+    # Score thresholds for each priority level, highest first
+    PRIORITY_THRESHOLDS = [
+        ('Critical', 70),
+        ('High', 50),
+        ('Medium', 30),
+    ]
+    
+    # Days-until-due values at which the urgency tier steps up as time passes
+    URGENCY_BREAKPOINTS = (14, 7, 3, 1, -1)
+    
     STRATEGIES = {
         'smart': {
             'urgency': 1.0,
@@ -43,15 +170,18 @@ class TaskPriorityScorer:
         }
     }
     
-    def __init__(self, strategy: str = 'smart'):
+    def __init__(self, strategy: str = 'smart', as_of: date = None):
         if strategy not in self.STRATEGIES:
             raise ValueError(f"Invalid strategy. Choose from: {list(self.STRATEGIES.keys())}")
         self.strategy = strategy
         self.multipliers = self.STRATEGIES[strategy]
+        # Snapshot "today" once so every task in a request is scored
+        # against the same date, even across midnight.
+        self.as_of = as_of or date.today()
     
     def calculate_urgency_score(self, due_date: date, current_date: date = None) -> Tuple[float, str]:
         if current_date is None:
-            current_date = date.today()
+            current_date = self.as_of
         
         days_until_due = (due_date - current_date).days
         
@@ -95,11 +225,11 @@ class TaskPriorityScorer:
         else:
             return 2, f"Large task ({estimated_hours} hours)"
     
-    def calculate_dependency_score(self, task_id: str, all_tasks: List[Dict]) -> Tuple[float, str]:
-        blocking_count = sum(
-            1 for task in all_tasks
-            if task_id in task.get('dependencies', [])
-        )
+    def calculate_dependency_score(self, task_id: str, all_tasks: List[Dict],
+                                   graph: DependencyGraph = None) -> Tuple[float, str]:
+        if graph is None:
+            graph = DependencyGraph(all_tasks)
+        blocking_count = graph.blocking_count(task_id)
         
         if blocking_count == 0:
             return 0, "No tasks blocked"
@@ -109,43 +239,69 @@ class TaskPriorityScorer:
         
         return score, explanation
     
-    def detect_circular_dependencies(self, tasks: List[Dict]) -> bool:
-        def has_cycle(task_id: str, visited: set, rec_stack: set) -> bool:
-            visited.add(task_id)
-            rec_stack.add(task_id)
-            
-            task = next((t for t in tasks if str(t.get('id')) == str(task_id)), None)
-            if task and 'dependencies' in task:
-                for dep_id in task['dependencies']:
-                    dep_id_str = str(dep_id)
-                    if dep_id_str not in visited:
-                        if has_cycle(dep_id_str, visited, rec_stack):
-                            return True
-                    elif dep_id_str in rec_stack:
-                        return True
-            
-            rec_stack.remove(task_id)
-            return False
-        
-        visited = set()
-        for task in tasks:
-            task_id = str(task.get('id'))
-            if task_id not in visited:
-                if has_cycle(task_id, visited, set()):
-                    return True
-        
-        return False
+    def detect_circular_dependencies(self, tasks: List[Dict],
+                                     graph: DependencyGraph = None) -> bool:
+        if graph is None:
+            graph = DependencyGraph(tasks)
+        return graph.has_cycle()
     
-    def calculate_priority(self, task: Dict, all_tasks: List[Dict]) -> Dict[str, Any]:
-        task_id = str(task.get('id', ''))
+    def get_priority_level(self, score: float) -> str:
+        for level, threshold in self.PRIORITY_THRESHOLDS:
+            if score >= threshold:
+                return level
+        return 'Low'
+    
+    def forecast_priority_crossings(self, due_date: date, static_score: float) -> Dict[str, Any]:
+        """
+        Dates on which a task first reaches each priority level.
+        
+        Only urgency changes with time, and only when days-until-due
+        crosses one of URGENCY_BREAKPOINTS, so the score is evaluated at
+        those few dates instead of day by day. ``static_score`` is the
+        weighted importance + effort + dependency part. A level that is
+        already reached maps to ``as_of``; one never reached maps to None.
+        """
+        candidates = [self.as_of] + sorted(
+            due_date - timedelta(days=days)
+            for days in self.URGENCY_BREAKPOINTS
+            if due_date - timedelta(days=days) > self.as_of
+        )
+        
+        crossings = {level: None for level, _ in self.PRIORITY_THRESHOLDS}
+        for when in candidates:
+            urgency_score, _ = self.calculate_urgency_score(due_date, current_date=when)
+            score = static_score + urgency_score * self.multipliers['urgency']
+            for level, threshold in self.PRIORITY_THRESHOLDS:
+                if crossings[level] is None and score >= threshold:
+                    crossings[level] = when
         
+        return crossings
+    
+    def _parse_due_date(self, task: Dict) -> date:
         due_date_str = task.get('due_date')
         if isinstance(due_date_str, str):
-            due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
+            return datetime.strptime(due_date_str, '%Y-%m-%d').date()
         elif isinstance(due_date_str, date):
-            due_date = due_date_str
-        else:
-            due_date = date.today()
+            return due_date_str
+        return self.as_of
+    
+    def component_scores(self, task: Dict, all_tasks: List[Dict],
+                         graph: DependencyGraph = None) -> Dict[str, float]:
+        """Unweighted factor scores for a task, keyed like the multipliers"""
+        return {
+            'urgency': self.calculate_urgency_score(self._parse_due_date(task))[0],
+            'importance': self.calculate_importance_score(task.get('importance', 5))[0],
+            'effort': self.calculate_effort_score(task.get('estimated_hours', 1))[0],
+            'dependency': self.calculate_dependency_score(
+                str(task.get('id', '')), all_tasks, graph=graph
+            )[0],
+        }
+    
+    def calculate_priority(self, task: Dict, all_tasks: List[Dict], forecast: bool = False,
+                           graph: DependencyGraph = None) -> Dict[str, Any]:
+        task_id = str(task.get('id', ''))
+        
+        due_date = self._parse_due_date(task)
         
         urgency_score, urgency_exp = self.calculate_urgency_score(due_date)
         importance_score, importance_exp = self.calculate_importance_score(
@@ -155,7 +311,7 @@ class TaskPriorityScorer:
             task.get('estimated_hours', 1)
         )
         dependency_score, dependency_exp = self.calculate_dependency_score(
-            task_id, all_tasks
+            task_id, all_tasks, graph=graph
         )
         
         weighted_urgency = urgency_score * self.multipliers['urgency']
@@ -182,16 +338,9 @@ class TaskPriorityScorer:
         
         explanation = ' • '.join(explanations) if explanations else 'Standard priority'
         
-        if total_score >= 70:
-            priority_level = 'Critical'
-        elif total_score >= 50:
-            priority_level = 'High'
-        elif total_score >= 30:
-            priority_level = 'Medium'
-        else:
-            priority_level = 'Low'
+        priority_level = self.get_priority_level(total_score)
         
-        return {
+        result = {
             'score': round(total_score, 1),
             'priority_level': priority_level,
             'explanation': explanation,
@@ -202,24 +351,109 @@ class TaskPriorityScorer:
                 'dependency': round(weighted_dependency, 1)
             }
         }
+        
+        if forecast:
+            result['priority_forecast'] = self.forecast_priority_crossings(
+                due_date, total_score - weighted_urgency
+            )
+        
+        return result
+    
+    def score_and_sort_tasks(self, tasks: List[Dict], check_cycles: bool = True,
+                             forecast: bool = False, cache=None) -> List[Dict]:
+        """Score every task and return them sorted by score, highest first."""
+        return self.rank_tasks(tasks, check_cycles, forecast, cache)[0]
     
-    def score_and_sort_tasks(self, tasks: List[Dict]) -> List[Dict]:
-        has_circular = self.detect_circular_dependencies(tasks)
+    def rank_tasks(self, tasks: List[Dict], check_cycles: bool = True,
+                   forecast: bool = False, cache=None) -> Tuple[List[Dict], bool]:
+        """
+        Score and sort every task; returns ``(ranked_tasks, has_circular)``
+        so callers need no separate cycle detection pass.
         
-        scored_tasks = []
-        for task in tasks:
-            score_data = self.calculate_priority(task, tasks)
-            scored_task = {**task, **score_data}
-            if has_circular:
-                scored_task['warning'] = 'Circular dependencies detected'
-            scored_tasks.append(scored_task)
+        The dependency graph is split into weakly connected components.
+        Cycle detection and scoring only ever need a task's own component,
+        so each component is scored on its own and, when a Django-style
+        ``cache`` is given, components with dependencies are cached under a
+        key derived from that component's content alone; editing one
+        cluster leaves the others' entries valid. Per-component rankings
+        are then merged.
+        """
+        # Intern ids once; every per-task lookup below is an array index
+        graph = DependencyGraph(tasks)
+        components = graph.components()
+        
+        # Only components with edges are cached: rescoring a lone task is
+        # cheaper than hashing it and a cache round trip. Lookups and
+        # stores are batched into one call each.
+        keys, cached, misses = {}, {}, {}
+        if cache is not None:
+            keys = {
+                index: self._component_cache_key(tasks, members, graph, check_cycles, forecast)
+                for index, members in enumerate(components) if len(members) > 1
+            }
+            if keys:
+                cached = cache.get_many(list(keys.values()))
         
-        scored_tasks.sort(key=lambda x: x['score'], reverse=True)
+        # One DFS colouring serves every component: they share no tasks
+        colour = graph.new_colouring() if check_cycles else None
+        ranked_components = []
+        any_circular = False
+        for index, members in enumerate(components):
+            key = keys.get(index)
+            entry = cached.get(key) if key is not None else None
+            if entry is None:
+                entry = self._score_component(tasks, members, graph, check_cycles, forecast, colour)
+                if key is not None:
+                    misses[key] = entry
+            has_circular, score_data = entry
+            any_circular = any_circular or has_circular
+            ranked = []
+            for position, data in zip(members, score_data):
+                scored_task = {**tasks[position], **data}
+                if has_circular:
+                    scored_task['warning'] = 'Circular dependencies detected'
+                ranked.append((-scored_task['score'], position, scored_task))
+            ranked.sort(key=lambda entry: entry[:2])
+            ranked_components.append(ranked)
+        if misses:
+            cache.set_many(misses)
         
-        return scored_tasks
+        # Ties keep input order, matching a single stable sort by score
+        ranked_tasks = [
+            entry[2] for entry in heapq.merge(*ranked_components, key=lambda entry: entry[:2])
+        ]
+        return ranked_tasks, any_circular
+    
+    def _score_component(self, tasks: List[Dict], members: List[int], graph: DependencyGraph,
+                         check_cycles: bool, forecast: bool,
+                         colour: bytearray = None) -> Tuple[bool, List[Dict]]:
+        # Stored tasks are kept acyclic at write time, so callers scoring
+        # them can skip the detection pass.
+        has_circular = check_cycles and graph.has_cycle(members, colour)
+        score_data = [
+            self.calculate_priority(tasks[i], tasks, forecast=forecast, graph=graph)
+            for i in members
+        ]
+        return has_circular, score_data
+    
+    def _component_cache_key(self, tasks: List[Dict], members: List[int], graph: DependencyGraph,
+                             check_cycles: bool, forecast: bool) -> str:
+        # A duplicated id reads the blocking count of its first carrier,
+        # which may sit in another component, so the counts are keyed
+        # alongside the members' content.
+        component = [tasks[i] for i in members]
+        blocking_counts = [graph.blocking_count(str(task.get('id', ''))) for task in component]
+        digest = hashlib.sha256(json.dumps(
+            [self.strategy, self.as_of, check_cycles, forecast, component, blocking_counts],
+            sort_keys=True, default=str
+        ).encode('utf-8')).hexdigest()
+        return f'task-score-component:{digest}'
+    
+    def get_top_suggestions(self, tasks: List[Dict], count: int = 3, cache=None) -> List[Dict]:
+        return self.suggestions_from_ranking(self.score_and_sort_tasks(tasks, cache=cache), count)
     
-    def get_top_suggestions(self, tasks: List[Dict], count: int = 3) -> List[Dict]:
-        scored_tasks = self.score_and_sort_tasks(tasks)
+    def suggestions_from_ranking(self, scored_tasks: List[Dict], count: int = 3) -> List[Dict]:
+        """Top ``count`` entries of an already sorted ranking, with recommendations"""
         suggestions = []
         
         for rank, task in enumerate(scored_tasks[:count], 1):
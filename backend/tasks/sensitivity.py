@@ -0,0 +1,169 @@
+"""
+Weight-sensitivity analysis for scoring strategies.
+
+A task's score is linear in each strategy multiplier: varying one weight
+``w`` with the others fixed gives ``score_i(w) = base_i + w * factor_i``.
+The top-k set can therefore only change where two of these lines cross,
+so breakpoints come from pairwise intersections and a sweep over them
+instead of re-scoring on a grid of weights.
+"""
+
+import heapq
+from typing import Any, Dict, List
+
+from .scoring import DependencyGraph, TaskPriorityScorer
+
+FACTORS = ('urgency', 'importance', 'effort', 'dependency')
+
+# Crossings closer together than this (relative to the weight) are one
+# breakpoint; float error in the intersection is orders of magnitude smaller.
+_TOLERANCE = 1e-9
+
+
+def weight_sensitivity(scorer: TaskPriorityScorer, tasks: List[Dict],
+                       top_k: int = 3, max_weight: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    For each multiplier, the weight intervals in ``[0, max_weight]`` over
+    which the top-k set is constant and the breakpoints between them.
+    """
+    graph = DependencyGraph(tasks)
+    raw = [scorer.component_scores(task, tasks, graph=graph) for task in tasks]
+    ids = [task.get('id') for task in tasks]
+
+    results = []
+    for factor in FACTORS:
+        current = scorer.multipliers[factor]
+        slopes = [scores[factor] for scores in raw]
+        bases = [
+            sum(scores[other] * scorer.multipliers[other] for other in FACTORS if other != factor)
+            for scores in raw
+        ]
+        intervals, breakpoints = _sweep(bases, slopes, top_k, 0.0, max(max_weight, current))
+
+        stable = next(
+            interval for interval in intervals
+            if interval['from'] <= current <= interval['to']
+        )
+        results.append({
+            'factor': factor,
+            'current_weight': current,
+            'stable_range': [stable['from'], stable['to']],
+            'intervals': [
+                {'from': i['from'], 'to': i['to'], 'top_k': [ids[p] for p in i['top_k']]}
+                for i in intervals
+            ],
+            'breakpoints': [
+                {
+                    'weight': b['weight'],
+                    'enters': [ids[p] for p in b['enters']],
+                    'leaves': [ids[p] for p in b['leaves']],
+                }
+                for b in breakpoints
+            ],
+        })
+    return results
+
+
+def _sweep(bases, slopes, k, lo, hi):
+    bases = _snap_coincident(bases, slopes)
+    candidates = _candidates(bases, slopes, k, lo, hi)
+
+    crossings = set()
+    for x, i in enumerate(candidates):
+        for j in candidates[x + 1:]:
+            if slopes[i] != slopes[j]:
+                w = (bases[j] - bases[i]) / (slopes[i] - slopes[j])
+                if lo < w < hi:
+                    crossings.add(w)
+    # Group crossings into breakpoints as [first, last] weight clusters
+    events = []
+    for w in sorted(crossings):
+        if events and w - events[-1][1] <= _TOLERANCE * max(1.0, abs(w)):
+            events[-1][1] = w
+        else:
+            events.append([w, w])
+
+    def top_between(a, b):
+        # No two lines cross strictly between consecutive breakpoints, so
+        # the midpoint's ranking holds for the whole gap and is never a tie
+        # (except for identical lines, which keep input order like the
+        # scorer's stable sort).
+        at = (a + b) / 2
+        return heapq.nsmallest(k, candidates, key=lambda i: (-(bases[i] + at * slopes[i]), i))
+
+    top = top_between(lo, events[0][0] if events else hi)
+    start = lo
+    intervals, breakpoints = [], []
+    for x, (first, last) in enumerate(events):
+        new_top = top_between(last, events[x + 1][0] if x + 1 < len(events) else hi)
+        if set(new_top) != set(top):
+            intervals.append({'from': start, 'to': first, 'top_k': top})
+            breakpoints.append({
+                'weight': first,
+                'enters': sorted(set(new_top) - set(top)),
+                'leaves': sorted(set(top) - set(new_top)),
+            })
+            start = first
+        top = new_top
+    intervals.append({'from': start, 'to': hi, 'top_k': top})
+    return intervals, breakpoints
+
+
+def _snap_coincident(bases, slopes):
+    """
+    Give lines that are the same up to float noise (equal slope, bases a
+    few ulps apart after summing different components) one shared base, so
+    they tie everywhere and keep input order instead of a noise ordering.
+    """
+    snapped = list(bases)
+    by_line = sorted(range(len(bases)), key=lambda i: (slopes[i], bases[i]))
+    for previous, i in zip(by_line, by_line[1:]):
+        if (slopes[i] == slopes[previous]
+                and bases[i] - snapped[previous] <= _TOLERANCE * max(1.0, abs(bases[i]))):
+            snapped[i] = snapped[previous]
+    return snapped
+
+
+def _candidates(bases, slopes, k, lo, hi):
+    """
+    Drop lines that can never reach the top k: a line strictly below at
+    least k others at both ends of the range is below them throughout.
+    Dominators are counted with a Fenwick tree in O(n log n).
+    """
+    n = len(bases)
+    if n <= k:
+        return list(range(n))
+
+    at_lo = [bases[i] + lo * slopes[i] for i in range(n)]
+    at_hi = [bases[i] + hi * slopes[i] for i in range(n)]
+    hi_ranks = {value: rank for rank, value in enumerate(sorted(set(at_hi), reverse=True), 1)}
+
+    tree = [0] * (len(hi_ranks) + 1)
+
+    def add(rank):
+        while rank < len(tree):
+            tree[rank] += 1
+            rank += rank & -rank
+
+    def count_up_to(rank):
+        total = 0
+        while rank > 0:
+            total += tree[rank]
+            rank -= rank & -rank
+        return total
+
+    by_lo = sorted(range(n), key=lambda i: -at_lo[i])
+    keep = []
+    start = 0
+    while start < n:
+        end = start
+        while end < n and at_lo[by_lo[end]] == at_lo[by_lo[start]]:
+            end += 1
+        # Only lines strictly higher at lo have been inserted so far
+        for i in by_lo[start:end]:
+            if count_up_to(hi_ranks[at_hi[i]] - 1) < k:
+                keep.append(i)
+        for i in by_lo[start:end]:
+            add(hi_ranks[at_hi[i]])
+        start = end
+    return sorted(keep)
@@ -1,5 +1,6 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Task
+from .models import DEFAULT_PROJECT, Task, check_same_project
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -14,7 +15,7 @@ class TaskSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Task
-        fields = ['id', 'title', 'due_date', 'estimated_hours', 
+        fields = ['id', 'project', 'title', 'due_date', 'estimated_hours', 
                   'importance', 'dependencies', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -34,22 +35,61 @@ class TaskSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate_project(self, value):
+        """Tasks cannot move between projects; their edges would cross them"""
+        if self.instance is not None and value != self.instance.project:
+            raise serializers.ValidationError("A task's project cannot be changed")
+        return value
+
+    def validate_dependencies(self, value):
+        """Reject dependencies that would create a cycle"""
+        if self.instance is not None:
+            try:
+                self.instance.check_new_dependencies(value)
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError(exc.message_dict['dependencies'])
+        return value
+
+    def validate(self, attrs):
+        """Reject dependencies on tasks in another project"""
+        if self.instance is None and attrs.get('dependencies'):
+            try:
+                check_same_project(attrs.get('project', DEFAULT_PROJECT), attrs['dependencies'])
+            except DjangoValidationError as exc:
+                raise serializers.ValidationError(exc.message_dict)
+        return attrs
+
 
 class TaskAnalysisInputSerializer(serializers.Serializer):
     """
     Serializer for task analysis input
-    Accepts a list of tasks (can be existing or new)
+    Accepts a list of tasks (can be existing or new), or the name of a
+    project whose stored tasks should be analyzed
     """
     tasks = serializers.ListField(
         child=serializers.DictField(),
         min_length=1,
+        required=False,
         help_text="List of tasks to analyze"
     )
+    project = serializers.SlugField(
+        max_length=64,
+        required=False,
+        help_text="Analyze this project's stored tasks instead of a task list"
+    )
     strategy = serializers.ChoiceField(
         choices=['smart', 'fastest', 'impact', 'deadline'],
         default='smart',
         help_text="Sorting strategy to use"
     )
+    as_of = serializers.DateField(
+        required=False,
+        help_text="Score as of this date instead of today"
+    )
+    forecast = serializers.BooleanField(
+        default=False,
+        help_text="Include the dates each task crosses the priority thresholds"
+    )
 
     def validate_tasks(self, value):
         """Validate task data in the list"""
@@ -85,6 +125,29 @@ class TaskAnalysisInputSerializer(serializers.Serializer):
         
         return value
 
+    def validate(self, attrs):
+        """Exactly one of tasks or project"""
+        if ('tasks' in attrs) == ('project' in attrs):
+            raise serializers.ValidationError("Provide either 'tasks' or 'project'")
+        return attrs
+
+
+class TaskSensitivityInputSerializer(TaskAnalysisInputSerializer):
+    """
+    Serializer for weight-sensitivity analysis input
+    """
+    top_k = serializers.IntegerField(
+        default=3,
+        min_value=1,
+        help_text="Size of the top set whose stability is analyzed"
+    )
+    max_weight = serializers.FloatField(
+        default=5.0,
+        min_value=0.1,
+        max_value=100,
+        help_text="Upper end of the weight range to analyze"
+    )
+
 
 class TaskScoreSerializer(serializers.Serializer):
     """
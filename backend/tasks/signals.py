@@ -0,0 +1,50 @@
+from django.core.exceptions import ValidationError
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .events import notify_ranking_change
+from .models import TableVersion, Task, add_dependency_edge, check_same_project, task_version_key
+from .topology import CycleError
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def keep_dependencies_acyclic(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Reject dependency edges that would create a cycle and keep the stored
+    topological order valid for the ones that don't.
+    """
+    if action != 'pre_add' or not pk_set:
+        return
+
+    check_same_project(instance.project, pk_set)
+    for other_id in sorted(pk_set):
+        if reverse:
+            # instance.dependent_tasks.add(other): other depends on instance
+            dependency_id, dependent_id = instance.pk, other_id
+        else:
+            dependency_id, dependent_id = other_id, instance.pk
+        try:
+            add_dependency_edge(dependency_id, dependent_id)
+        except CycleError as exc:
+            raise ValidationError({'dependencies': str(exc)})
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_task_version(sender, instance, **kwargs):
+    """Invalidate ETags and cached rankings for the task's project on every write"""
+    bump_versions(instance.project)
+    notify_ranking_change([instance.pk], instance.project)
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def bump_task_version_on_dependency_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # Edges never cross projects, so only the instance's project changes
+        bump_versions(instance.project)
+        notify_ranking_change({instance.pk} | set(pk_set or ()), instance.project)
+
+
+def bump_versions(project):
+    TableVersion.bump(task_version_key())
+    TableVersion.bump(task_version_key(project))
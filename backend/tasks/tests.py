@@ -57,3 +57,1011 @@ class TaskScoringTests(TestCase):
         self.assertIn('score', result)
         self.assertIn('priority_level', result)
         self.assertGreater(result['score'], 0)
+
+
+class TaskStorageTests(TestCase):
+
+    def test_sqlite_pragmas_applied(self):
+        """Test that connections are opened with the tuned SQLite pragmas"""
+        from django.db import connection
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_task_indexes_exist(self):
+        """Test that project-scoped list/due-date and reverse dependency indexes are created"""
+        from django.db import connection
+        with connection.cursor() as cursor:
+            task_indexes = connection.introspection.get_constraints(cursor, 'tasks_task')
+            dep_indexes = connection.introspection.get_constraints(
+                cursor, 'tasks_task_dependencies'
+            )
+        self.assertEqual(
+            task_indexes['task_project_created_idx']['columns'], ['project', 'created_at']
+        )
+        self.assertEqual(
+            task_indexes['task_project_due_idx']['columns'], ['project', 'due_date', 'id']
+        )
+        self.assertEqual(
+            dep_indexes['tasks_task_dependencies_to_from_idx']['columns'],
+            ['to_task_id', 'from_task_id']
+        )
+
+
+class TaskCursorPaginationTests(TestCase):
+
+    def setUp(self):
+        from .models import Task
+        self.tasks = [
+            Task.objects.create(
+                title=f'Task {i}',
+                due_date=date.today() + timedelta(days=i % 3),
+                estimated_hours=1,
+                importance=5
+            )
+            for i in range(7)
+        ]
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_walks_all_pages_in_created_order(self):
+        """Test that following next links visits every task exactly once"""
+        ids = self._walk('/api/tasks/?page_size=3')
+        expected = [t.id for t in sorted(
+            self.tasks, key=lambda t: (t.created_at, t.id), reverse=True
+        )]
+        self.assertEqual(ids, expected)
+
+    def test_due_date_ordering_breaks_ties_by_id(self):
+        """Test keyset paging over due_date with duplicate dates"""
+        ids = self._walk('/api/tasks/?ordering=due_date&page_size=2')
+        expected = [t.id for t in sorted(self.tasks, key=lambda t: (t.due_date, t.id))]
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        """Test that the previous cursor walks back to the same rows"""
+        first = self.client.get('/api/tasks/?page_size=3')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+
+    def test_page_size_is_capped(self):
+        """Test that page_size above the maximum is clamped"""
+        from .pagination import TaskCursorPagination
+        self.assertEqual(TaskCursorPagination.max_page_size, 1000)
+        response = self.client.get('/api/tasks/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 7)
+
+    def test_invalid_cursor_returns_404(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get('/api/tasks/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def page_query_plan(self, ordering):
+        """EXPLAIN QUERY PLAN of the page query behind a second-page request"""
+        from django.db import connection
+        first = self.client.get(f'/api/tasks/?ordering={ordering}&page_size=2')
+        executed = []
+
+        def record(execute, sql, params, many, context):
+            executed.append((sql, params))
+            return execute(sql, params, many, context)
+
+        # Plan the statement as run, with bound parameters: SQLite plans
+        # inlined literals differently
+        with connection.execute_wrapper(record):
+            self.client.get(first.data['next'])
+        sql, params = next(
+            (sql, params) for sql, params in executed
+            if 'FROM "tasks_task"' in sql and 'LIMIT' in sql
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def test_cursor_page_is_an_index_range_scan(self):
+        """Test that deep pages seek into the index instead of scanning from the start"""
+        for ordering, index in [
+            ('-created_at', 'task_project_created_idx'),
+            ('created_at', 'task_project_created_idx'),
+            ('-due_date', 'task_project_due_idx'),
+            ('due_date', 'task_project_due_idx'),
+        ]:
+            plan = self.page_query_plan(ordering)
+            field = ordering.lstrip('-')
+            self.assertRegex(plan, rf'USING INDEX {index} \(project=\? AND {field}[<>]\?\)')
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TaskDependencyWalkTests(TestCase):
+
+    def setUp(self):
+        from .models import Task
+        make = lambda title: Task.objects.create(
+            title=title, due_date=date.today(), estimated_hours=1, importance=5
+        )
+        # design <- build <- test <- release, and design <- docs <- release
+        self.design = make('Design')
+        self.build = make('Build')
+        self.test = make('Test')
+        self.docs = make('Docs')
+        self.release = make('Release')
+        self.build.dependencies.add(self.design)
+        self.test.dependencies.add(self.build)
+        self.docs.dependencies.add(self.design)
+        self.release.dependencies.add(self.test, self.docs)
+
+    def test_direct_blockers(self):
+        """Test that non-transitive blockers are the direct dependencies only"""
+        response = self.client.get(f'/api/tasks/{self.release.id}/blockers/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {t['id'] for t in response.data['tasks']},
+            {self.test.id, self.docs.id}
+        )
+
+    def test_transitive_blockers_report_shortest_depth_and_path(self):
+        """Test transitive blockers with depth and path information"""
+        response = self.client.get(
+            f'/api/tasks/{self.release.id}/blockers/?transitive=true'
+        )
+        by_id = {t['id']: t for t in response.data['tasks']}
+        self.assertEqual(len(by_id), 4)
+        self.assertEqual(by_id[self.design.id]['depth'], 2)
+        self.assertEqual(
+            by_id[self.design.id]['path'],
+            [self.release.id, self.docs.id, self.design.id]
+        )
+        self.assertEqual(by_id[self.build.id]['depth'], 2)
+
+    def test_transitive_blocked_respects_max_depth(self):
+        """Test that max_depth bounds the walk over dependent tasks"""
+        response = self.client.get(
+            f'/api/tasks/{self.design.id}/blocked/?transitive=true&max_depth=2'
+        )
+        self.assertEqual(
+            {t['id'] for t in response.data['tasks']},
+            {self.build.id, self.docs.id, self.test.id, self.release.id}
+        )
+        response = self.client.get(
+            f'/api/tasks/{self.design.id}/blocked/?transitive=true&max_depth=1'
+        )
+        self.assertEqual(
+            {t['id'] for t in response.data['tasks']},
+            {self.build.id, self.docs.id}
+        )
+
+    def test_walk_reports_truncation_at_max_depth(self):
+        """Test that a walk cut short by max_depth says so"""
+        url = f'/api/tasks/{self.design.id}/blocked/?transitive=true&max_depth='
+        self.assertTrue(self.client.get(url + '1').data['truncated'])
+        response = self.client.get(url + '2')
+        self.assertFalse(response.data['truncated'])
+        self.assertEqual(
+            [(t['id'], t['depth']) for t in response.data['tasks']],
+            sorted([(self.build.id, 1), (self.docs.id, 1), (self.test.id, 2), (self.release.id, 2)],
+                   key=lambda item: (item[1], item[0]))
+        )
+        self.assertFalse(
+            self.client.get(f'/api/tasks/{self.release.id}/blocked/').data['truncated']
+        )
+
+    def test_bounded_and_full_walks_agree(self):
+        """Test that the depth-bounded SQL walk matches the full reach walk"""
+        from unittest import mock
+        from . import models
+        for task, direction in [(self.design, 'dependents'), (self.release, 'dependencies')]:
+            for depth in (1, 2, 3):
+                bounded = models.walk_dependency_graph(task.id, direction, depth)
+                with mock.patch.object(models, 'BOUNDED_WALK_DEPTH', 0):
+                    full = models.walk_dependency_graph(task.id, direction, depth)
+                self.assertEqual(bounded, full, (direction, depth))
+
+    def test_invalid_max_depth(self):
+        """Test that an out-of-range max_depth is rejected"""
+        response = self.client.get(
+            f'/api/tasks/{self.design.id}/blocked/?transitive=true&max_depth=0'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class DependencyCycleTests(TestCase):
+
+    def setUp(self):
+        from .models import Task
+        make = lambda title: Task.objects.create(
+            title=title, due_date=date.today(), estimated_hours=1, importance=5
+        )
+        self.a, self.b, self.c = make('A'), make('B'), make('C')
+        self.b.dependencies.add(self.a)
+        self.c.dependencies.add(self.b)
+
+    def _assert_topologically_ordered(self):
+        from .models import Task
+        order = dict(Task.objects.values_list('id', 'topo_order'))
+        for task in Task.objects.prefetch_related('dependencies'):
+            for dep in task.dependencies.all():
+                self.assertLess(order[dep.id], order[task.id])
+
+    def test_cycle_rejected_at_write_time(self):
+        """Test that an edge closing a cycle is rejected before it is stored"""
+        from django.core.exceptions import ValidationError
+        from django.db import transaction
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.a.dependencies.add(self.c)
+        self.assertFalse(self.a.dependencies.exists())
+
+    def test_cyclic_update_rejected_via_api(self):
+        """Test that the API returns 400 for a cyclic dependency update"""
+        response = self.client.patch(
+            f'/api/tasks/{self.a.id}/',
+            {'dependencies': [self.c.id]},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('dependencies', response.data)
+
+    def test_backward_edge_reorders_affected_tasks(self):
+        """Test that a backward edge repairs the stored topological order"""
+        from .models import Task
+        d = Task.objects.create(
+            title='D', due_date=date.today(), estimated_hours=1, importance=5
+        )
+        # A now waits on the newest task, which sorts last before the edge
+        self.a.dependencies.add(d)
+        self._assert_topologically_ordered()
+
+    def test_analyze_stored_tasks(self):
+        """Test ranking stored tasks without a cycle detection pass"""
+        response = self.client.get('/api/tasks/analyze-stored/?strategy=impact')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_tasks'], 3)
+        self.assertFalse(response.data['circular_dependencies'])
+
+    def test_topology_reorder_for_edge(self):
+        """Test the online reorder on an in-memory graph"""
+        from .topology import CycleError, reorder_for_edge
+        edges = {(1, 2), (3, 4)}
+        order = {1: 1, 2: 2, 3: 3, 4: 4}
+
+        def successors(frontier, upper):
+            return {b: order[b] for a, b in edges if a in frontier and order[b] <= upper}
+
+        def predecessors(frontier, lower):
+            return {a: order[a] for a, b in edges if b in frontier and order[a] >= lower}
+
+        moves = reorder_for_edge(4, 1, dict(order), successors, predecessors)
+        order.update(moves)
+        edges.add((4, 1))
+        for a, b in edges:
+            self.assertLess(order[a], order[b])
+        with self.assertRaises(CycleError):
+            reorder_for_edge(2, 3, dict(order), successors, predecessors)
+
+
+    def test_cycle_edges_only_break_cycles(self):
+        """Test that only backward edges inside a cycle are dropped"""
+        from .topology import cycle_edges, initial_order
+        nodes = [1, 2, 3, 4, 5, 6]
+        # 1 -> 2 -> 3 -> 1 is a cycle; 4 and 5 hang off it; 6 loops on itself
+        edges = [(1, 2), (2, 3), (3, 1), (3, 4), (5, 2), (6, 6), (4, 6)]
+        dropped = cycle_edges(nodes, edges)
+        self.assertEqual(dropped, [(3, 1), (6, 6)])
+        kept = [edge for edge in edges if edge not in dropped]
+        order = initial_order(nodes, kept)
+        for a, b in kept:
+            self.assertLess(order[a], order[b])
+
+    def test_migration_drops_existing_cycles(self):
+        """Test that populating topo_order removes cycles left by older data"""
+        from importlib import import_module
+        from django.apps import apps
+        from .models import Task
+        migration = import_module('tasks.migrations.0003_task_topo_order')
+        downstream = Task.objects.create(
+            title='D', due_date=date.today(), estimated_hours=1, importance=5
+        )
+        Through = Task.dependencies.through
+        # Written directly, as before write-time checks existed: A waits on
+        # C, closing A <- B <- C <- A, and D waits on C
+        Through.objects.bulk_create([
+            Through(from_task_id=self.a.id, to_task_id=self.c.id),
+            Through(from_task_id=downstream.id, to_task_id=self.c.id),
+        ])
+        migration.populate_topo_order(apps, None)
+        self.assertFalse(self.a.dependencies.exists())
+        self.assertEqual(list(downstream.dependencies.all()), [self.c])
+        self._assert_topologically_ordered()
+        self.assertFalse(TaskPriorityScorer().detect_circular_dependencies(
+            [task.to_dict() for task in Task.objects.all()]
+        ))
+
+
+class AsOfScoringTests(TestCase):
+
+    def test_urgency_uses_as_of_snapshot(self):
+        """Test that scoring is relative to the as_of date, not today"""
+        as_of = date(2030, 1, 10)
+        scorer = TaskPriorityScorer(as_of=as_of)
+        score, explanation = scorer.calculate_urgency_score(date(2030, 1, 9))
+        self.assertEqual(score, 40)
+        self.assertIn("Overdue by 1", explanation)
+
+    def test_forecast_matches_day_by_day_scoring(self):
+        """Test analytic threshold crossings against brute-force rescoring"""
+        as_of = date(2030, 1, 1)
+        task = {
+            'id': 't1', 'title': 'Report', 'due_date': '2030-01-31',
+            'estimated_hours': 2, 'importance': 7, 'dependencies': []
+        }
+        for strategy in TaskPriorityScorer.STRATEGIES:
+            scorer = TaskPriorityScorer(strategy=strategy, as_of=as_of)
+            forecast = scorer.calculate_priority(task, [task], forecast=True)['priority_forecast']
+
+            levels = [level for level, _ in TaskPriorityScorer.PRIORITY_THRESHOLDS]
+            expected = {level: None for level in levels}
+            for offset in range(60):
+                day = as_of + timedelta(days=offset)
+                level = TaskPriorityScorer(strategy=strategy, as_of=day).calculate_priority(
+                    task, [task]
+                )['priority_level']
+                rank = levels.index(level) if level in levels else len(levels)
+                # Reaching a level also means reaching every level below it
+                for idx, name in enumerate(levels):
+                    if expected[name] is None and rank <= idx:
+                        expected[name] = day
+            self.assertEqual(forecast, expected, strategy)
+
+    def test_analyze_endpoint_accepts_as_of_and_forecast(self):
+        """Test that the analyze endpoint scores against the requested date"""
+        response = self.client.post(
+            '/api/tasks/analyze/',
+            {
+                'tasks': [{'title': 'A', 'due_date': '2030-01-05', 'importance': 5}],
+                'as_of': '2030-01-01',
+                'forecast': True
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        task = response.data['tasks'][0]
+        self.assertEqual(task['breakdown']['urgency'], 20)
+        self.assertEqual(task['priority_forecast']['Medium'], date(2030, 1, 1))
+
+
+class LoadTestHelperTests(TestCase):
+
+    def test_synthetic_payload_is_valid_and_acyclic(self):
+        """Test that generated load-test payloads pass analysis validation"""
+        import random
+        from .management.commands.loadtest import generate_tasks
+        from .serializers import TaskAnalysisInputSerializer
+        tasks = generate_tasks(40, random.Random(1))
+        serializer = TaskAnalysisInputSerializer(data={'tasks': tasks})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertFalse(TaskPriorityScorer().detect_circular_dependencies(tasks))
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles used in the load-test report"""
+        from .management.commands.loadtest import percentile
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+class DependencyGraphTests(TestCase):
+
+    def test_int_and_string_ids_agree(self):
+        """Test that DB integer ids and string references are interned alike"""
+        scorer = TaskPriorityScorer()
+        tasks = [
+            {'id': 1, 'dependencies': []},
+            {'id': '2', 'dependencies': [1]},
+            {'id': 3, 'dependencies': ['1', '2', '1']},
+        ]
+        score, explanation = scorer.calculate_dependency_score('1', tasks)
+        self.assertEqual(explanation, "Blocks 2 task(s)")
+        self.assertEqual(score, 10)
+        self.assertFalse(scorer.detect_circular_dependencies(tasks))
+        tasks[0]['dependencies'] = ['3']
+        self.assertTrue(scorer.detect_circular_dependencies(tasks))
+
+    def test_csr_layout(self):
+        """Test dense positions and CSR dependency slices"""
+        from .scoring import DependencyGraph
+        graph = DependencyGraph([
+            {'id': 'a', 'dependencies': ['missing']},
+            {'id': 'b', 'dependencies': ['a']},
+            {'id': 'c', 'dependencies': ['a', 'b']},
+        ])
+        self.assertEqual(list(graph.offsets), [0, 0, 1, 3])
+        self.assertEqual(list(graph.dependencies_of(2)), [0, 1])
+        self.assertEqual(list(graph.blocking_counts), [2, 1, 0])
+
+    def test_long_chain_does_not_recurse(self):
+        """Test cycle detection on a chain deeper than the recursion limit"""
+        tasks = [{'id': i, 'dependencies': [i - 1] if i else []} for i in range(5000)]
+        self.assertFalse(TaskPriorityScorer().detect_circular_dependencies(tasks))
+
+
+class ConditionalGetTests(TestCase):
+
+    def _create_task(self):
+        return self.client.post(
+            '/api/tasks/',
+            {'title': 'A', 'due_date': '2030-01-01', 'estimated_hours': 1, 'importance': 5},
+            content_type='application/json'
+        )
+
+    def test_task_list_not_modified_until_write(self):
+        """Test 304 for an unchanged listing and a new ETag after a write"""
+        self._create_task()
+        first = self.client.get('/api/tasks/')
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('W/'))
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        self._create_task()
+        fresh = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], etag)
+
+    def test_dependency_change_invalidates_etag(self):
+        """Test that editing a dependency edge changes the listing ETag"""
+        from .models import Task
+        a = Task.objects.get(pk=self._create_task().data['id'])
+        b = Task.objects.get(pk=self._create_task().data['id'])
+        etag = self.client.get('/api/tasks/')['ETag']
+        b.dependencies.add(a)
+        self.assertNotEqual(self.client.get('/api/tasks/')['ETag'], etag)
+
+    def test_strategies_are_cacheable(self):
+        """Test long-lived cache headers and 304 for strategy metadata"""
+        response = self.client.get('/api/strategies/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=86400', response['Cache-Control'])
+        cached = self.client.get('/api/strategies/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertIn('max-age=86400', cached['Cache-Control'])
+
+
+class ComponentPartitionTests(TestCase):
+
+    class DictCache(dict):
+        def __init__(self):
+            super().__init__()
+            self.sets = 0
+            self.hits = 0
+
+        def get_many(self, keys):
+            found = {key: self[key] for key in keys if key in self}
+            self.hits += len(found)
+            return found
+
+        def set_many(self, mapping):
+            self.sets += len(mapping)
+            self.update(mapping)
+
+    def _tasks(self):
+        day = (date.today() + timedelta(days=5)).isoformat()
+        return [
+            {'id': 'a1', 'title': 'A1', 'due_date': day, 'importance': 9, 'estimated_hours': 1, 'dependencies': []},
+            {'id': 'b1', 'title': 'B1', 'due_date': day, 'importance': 4, 'estimated_hours': 5, 'dependencies': []},
+            {'id': 'a2', 'title': 'A2', 'due_date': day, 'importance': 6, 'estimated_hours': 2, 'dependencies': ['a1']},
+            {'id': 'b2', 'title': 'B2', 'due_date': day, 'importance': 7, 'estimated_hours': 9, 'dependencies': ['b1']},
+            {'id': 'c1', 'title': 'C1', 'due_date': day, 'importance': 5, 'estimated_hours': 1, 'dependencies': []},
+        ]
+
+    def test_union_find_components(self):
+        """Test that independent clusters become separate components"""
+        from .scoring import DependencyGraph
+        graph = DependencyGraph(self._tasks())
+        self.assertEqual(graph.components(), [[0, 2], [1, 3], [4]])
+
+    def test_merged_ranking_matches_global_sort(self):
+        """Test that merging per-component rankings equals one stable sort"""
+        scorer = TaskPriorityScorer()
+        tasks = self._tasks()
+        ranked = scorer.score_and_sort_tasks(tasks)
+        expected = sorted(
+            (dict(t, **scorer.calculate_priority(t, tasks)) for t in tasks),
+            key=lambda x: x['score'], reverse=True
+        )
+        self.assertEqual([t['id'] for t in ranked], [t['id'] for t in expected])
+
+    def test_components_share_one_colouring(self):
+        """Test that per-component cycle checks can reuse one colour array"""
+        from .scoring import DependencyGraph
+        tasks = self._tasks()
+        tasks[1]['dependencies'] = ['b2']
+        graph = DependencyGraph(tasks)
+        colour = graph.new_colouring()
+        self.assertEqual(
+            [graph.has_cycle(members, colour) for members in graph.components()],
+            [graph.has_cycle(members) for members in graph.components()]
+        )
+        self.assertEqual([graph.has_cycle(m) for m in graph.components()], [False, True, False])
+
+    def test_cycle_warning_scoped_to_component(self):
+        """Test that only tasks in a cyclic component carry the warning"""
+        tasks = self._tasks()
+        tasks[0]['dependencies'] = ['a2']
+        ranked = {t['id']: t for t in TaskPriorityScorer().score_and_sort_tasks(tasks)}
+        self.assertIn('warning', ranked['a1'])
+        self.assertIn('warning', ranked['a2'])
+        self.assertNotIn('warning', ranked['b1'])
+
+    def test_analyze_reports_cycles_from_the_ranking_pass(self):
+        """Test that analyze flags cycles without a second detection pass"""
+        from unittest import mock
+        tasks = self._tasks()
+        tasks[0]['dependencies'] = ['a2']
+        with mock.patch.object(TaskPriorityScorer, 'detect_circular_dependencies') as detect:
+            for payload, expected in [(tasks, True), (self._tasks(), False)]:
+                response = self.client.post(
+                    '/api/tasks/analyze/', {'tasks': payload}, content_type='application/json'
+                )
+                self.assertEqual(response.data['circular_dependencies'], expected)
+        detect.assert_not_called()
+
+    def test_editing_one_component_keeps_other_cache_entries(self):
+        """Test per-component cache keys survive edits to other clusters"""
+        cache = self.DictCache()
+        scorer = TaskPriorityScorer()
+        tasks = self._tasks()
+        first = scorer.score_and_sort_tasks(tasks, cache=cache)
+        # The lone task c1 is cheaper to rescore than to cache
+        self.assertEqual((cache.sets, cache.hits), (2, 0))
+
+        tasks[3]['importance'] = 10
+        second = scorer.score_and_sort_tasks(tasks, cache=cache)
+        self.assertEqual((cache.sets, cache.hits), (3, 1))
+        self.assertEqual(
+            {t['id']: t['score'] for t in second if not t['id'].startswith('b')},
+            {t['id']: t['score'] for t in first if not t['id'].startswith('b')}
+        )
+
+    def test_duplicate_id_cache_entry_tracks_blocking_count(self):
+        """Test a duplicated id is not served another graph's dependency score"""
+        day = (date.today() + timedelta(days=5)).isoformat()
+        x = {'id': 'x', 'title': 'X', 'due_date': day, 'importance': 5, 'dependencies': []}
+        y = {'id': 'y', 'title': 'Y', 'due_date': day, 'importance': 5, 'dependencies': ['x']}
+        q = {'id': 'q', 'title': 'Q', 'due_date': day, 'importance': 5, 'dependencies': []}
+        # Same id as x, but in its own component through its edge to q
+        duplicate = dict(x, title='X2', dependencies=['q'])
+        cache = self.DictCache()
+        scorer = TaskPriorityScorer()
+
+        scorer.score_and_sort_tasks([x, y, duplicate, q], cache=cache)
+        ranked = scorer.score_and_sort_tasks([x, duplicate, q], cache=cache)
+        fresh = scorer.score_and_sort_tasks([x, duplicate, q])
+        self.assertEqual(ranked, fresh)
+        self.assertEqual(
+            [t['breakdown']['dependency'] for t in ranked if t['title'] == 'X2'], [0.0]
+        )
+
+
+class WeightSensitivityTests(TestCase):
+
+    def _brute_force_top(self, scorer, components, factor, weight, k):
+        multipliers = dict(scorer.multipliers, **{factor: weight})
+        # Totals equal up to float noise are ties, broken by input order
+        totals = [
+            round(sum(value * multipliers[f] for f, value in scores.items()), 9)
+            for scores in components
+        ]
+        ranked = sorted(range(len(components)), key=lambda i: (-totals[i], i))
+        return set(ranked[:k])
+
+    def test_intervals_match_brute_force(self):
+        """Test that each reported interval's top-k matches direct scoring"""
+        import random
+        from .management.commands.loadtest import generate_tasks
+        from .sensitivity import weight_sensitivity
+        for seed in range(30):
+            tasks = generate_tasks(25, random.Random(seed))
+            positions = {task['id']: i for i, task in enumerate(tasks)}
+            for strategy in ('smart', 'impact'):
+                scorer = TaskPriorityScorer(strategy=strategy, as_of=date.today())
+                components = [scorer.component_scores(t, tasks) for t in tasks]
+                for k in range(1, 9):
+                    for result in weight_sensitivity(scorer, tasks, top_k=k, max_weight=5.0):
+                        for interval in result['intervals']:
+                            width = interval['to'] - interval['from']
+                            for fraction in (0.01, 0.5, 0.99):
+                                weight = interval['from'] + fraction * width
+                                self.assertEqual(
+                                    {positions[i] for i in interval['top_k']},
+                                    self._brute_force_top(scorer, components, result['factor'], weight, k),
+                                    (seed, strategy, k, result['factor'], weight, interval)
+                                )
+                        lo, hi = result['stable_range']
+                        self.assertTrue(lo <= result['current_weight'] <= hi)
+
+    def test_breakpoint_from_line_intersection(self):
+        """Test a single swap at the analytically expected weight"""
+        from .sensitivity import weight_sensitivity
+        far = (date.today() + timedelta(days=30)).isoformat()
+        near = (date.today() + timedelta(days=2)).isoformat()
+        tasks = [
+            # urgency 5, importance 27, effort 2 -> base 29 + 5w
+            {'id': 'important', 'due_date': far, 'importance': 9, 'estimated_hours': 10},
+            # urgency 30, importance 6, effort 2 -> base 8 + 30w
+            {'id': 'urgent', 'due_date': near, 'importance': 2, 'estimated_hours': 10},
+        ]
+        scorer = TaskPriorityScorer()
+        urgency = weight_sensitivity(scorer, tasks, top_k=1)[0]
+        self.assertEqual(urgency['factor'], 'urgency')
+        self.assertEqual(len(urgency['breakpoints']), 1)
+        self.assertAlmostEqual(urgency['breakpoints'][0]['weight'], 21 / 25)
+        self.assertEqual(urgency['breakpoints'][0]['enters'], ['urgent'])
+        self.assertEqual(urgency['stable_range'], [21 / 25, 5.0])
+
+    def test_endpoint(self):
+        """Test the sensitivity endpoint response shape"""
+        response = self.client.post(
+            '/api/tasks/sensitivity/',
+            {
+                'tasks': [
+                    {'title': 'A', 'due_date': '2030-01-05', 'importance': 5},
+                    {'title': 'B', 'due_date': '2030-02-05', 'importance': 9},
+                ],
+                'top_k': 1
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [f['factor'] for f in response.data['factors']],
+            ['urgency', 'importance', 'effort', 'dependency']
+        )
+
+
+class RankingEventTests(TestCase):
+
+    def test_diff_reports_only_affected_tasks(self):
+        """Test that diffs carry touched, rescored, new and removed tasks"""
+        from .events import diff_rankings
+        previous = {1: (1, 50.0, 'High'), 2: (2, 40.0, 'Medium'), 3: (3, 30.0, 'Medium')}
+        current = {1: (1, 50.0, 'High'), 3: (2, 45.0, 'Medium'), 4: (3, 20.0, 'Low')}
+        diff = diff_rankings(previous, current)
+        self.assertEqual([c['id'] for c in diff['changed']], [3, 4])
+        self.assertEqual(diff['changed'][0]['previous_rank'], 3)
+        self.assertIsNone(diff['changed'][1]['previous_rank'])
+        self.assertEqual(diff['removed'], [2])
+        self.assertEqual(
+            [c['id'] for c in diff_rankings(previous, previous, touched={2})['changed']],
+            [2]
+        )
+
+    def test_diff_reports_rank_only_moves(self):
+        """Test that tasks shifted by another task's change are included"""
+        from .events import diff_rankings
+        previous = {1: (1, 50.0, 'High'), 2: (2, 40.0, 'Medium'), 3: (3, 30.0, 'Medium')}
+        current = {2: (1, 40.0, 'Medium'), 3: (2, 30.0, 'Medium')}
+        diff = diff_rankings(previous, current)
+        self.assertEqual(
+            [(c['id'], c['previous_rank'], c['rank']) for c in diff['changed']],
+            [(2, 2, 1), (3, 3, 2)]
+        )
+        self.assertEqual(diff['removed'], [1])
+
+    def test_feed_released_after_last_subscriber(self):
+        """Test that a feed is dropped from the registry once nobody listens"""
+        from asgiref.sync import async_to_sync
+        from .events import _feeds, get_feed
+
+        async def scenario():
+            feed = get_feed('impact', 'alpha')
+            first, _ = await feed.subscribe()
+            second, _ = await feed.subscribe()
+            feed.unsubscribe(first)
+            self.assertIs(_feeds[('alpha', 'impact')], feed)
+            feed.unsubscribe(second)
+            self.assertNotIn(('alpha', 'impact'), _feeds)
+            self.assertIsNot(get_feed('impact', 'alpha'), feed)
+
+        async_to_sync(scenario)()
+        _feeds.pop(('alpha', 'impact'), None)
+
+    def test_feed_coalesces_rapid_edits(self):
+        """Test that several notifications inside the window yield one event"""
+        import asyncio
+        from asgiref.sync import async_to_sync, sync_to_async
+        from .events import RankingFeed
+        from .models import Task
+
+        def make(title, importance):
+            return Task.objects.create(
+                title=title, due_date=date.today(), estimated_hours=1, importance=importance
+            ).pk
+
+        feed = RankingFeed('smart')
+
+        async def scenario():
+            queue, snapshot = await feed.subscribe()
+            self.assertEqual(snapshot, {})
+            first = await sync_to_async(make)('A', 5)
+            feed.notify([first])
+            second = await sync_to_async(make)('B', 9)
+            feed.notify([second])
+            sequence, diff = await asyncio.wait_for(queue.get(), 2)
+            await asyncio.sleep(0.4)
+            self.assertTrue(queue.empty())
+            feed.unsubscribe(queue)
+            return sequence, diff
+
+        sequence, diff = async_to_sync(scenario)()
+        self.assertEqual(sequence, 1)
+        self.assertEqual(len(diff['changed']), 2)
+        self.assertEqual(diff['total_tasks'], 2)
+
+    def test_stream_requires_asgi(self):
+        """Test that the event stream refuses to run under WSGI"""
+        response = self.client.get('/api/tasks/events/')
+        self.assertEqual(response.status_code, 501)
+
+
+class TaskTransferTests(TestCase):
+
+    CSV = (
+        'id,title,due_date,estimated_hours,importance,dependencies\n'
+        'a,Write spec,2030-01-10,2,8,\n'
+        'b,Build it,2030-01-20,5,7,a;c\n'
+        'c,Design schema,2030-01-05,1,6,\n'
+    )
+
+    def test_csv_import_resolves_forward_references(self):
+        """Test that CSV rows may depend on rows later in the file"""
+        from .models import Task
+        from .transfer import import_tasks
+        summary = import_tasks(self.CSV.splitlines(keepends=True), 'csv', batch_size=2)
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(summary['dependencies_created'], 2)
+        build = Task.objects.get(title='Build it')
+        self.assertEqual(
+            sorted(build.dependencies.values_list('title', flat=True)),
+            ['Design schema', 'Write spec']
+        )
+        for dep in build.dependencies.all():
+            self.assertLess(dep.topo_order, build.topo_order)
+        self.assertIsNotNone(build.created_at)
+
+    def test_import_skips_bad_rows_and_cyclic_edges(self):
+        """Test that invalid rows are reported and cycle-closing edges dropped"""
+        from .models import Task
+        from .transfer import import_tasks
+        lines = [
+            '{"id": 1, "title": "One", "due_date": "2030-01-01", "importance": 5, "dependencies": [2]}\n',
+            '{"id": 2, "title": "Two", "due_date": "2030-01-01", "importance": 5, "dependencies": [1, 9]}\n',
+            '{"id": 3, "title": "", "due_date": "2030-01-01", "importance": 5}\n',
+            'not json\n',
+            '{"id": 4, "title": "Four", "due_date": "soon", "importance": 5}\n',
+        ]
+        summary = import_tasks(lines, 'jsonl')
+        self.assertEqual(summary['created'], 2)
+        self.assertEqual(summary['skipped_rows'], 3)
+        self.assertEqual(len(summary['errors']), 3)
+        self.assertTrue(summary['errors'][0].startswith('Line 3:'))
+        # One of the two cycle edges survives, the unknown reference does not
+        self.assertEqual(summary['dependencies_created'], 1)
+        self.assertEqual(summary['skipped_dependencies'], 2)
+        self.assertEqual(Task.dependencies.through.objects.count(), 1)
+
+    def test_import_reports_mistyped_json_rows(self):
+        """Test that rows with wrong field types are skipped, not fatal"""
+        import json
+        from .models import Task
+        valid = {'id': 'ok', 'title': 'Fine', 'due_date': '2030-01-01', 'importance': 5}
+        bad = [
+            ({'dependencies': 5}, 'dependencies must be a list'),
+            ({'dependencies': '12'}, 'dependencies must be a list'),
+            ({'dependencies': [{'id': 1}]}, 'dependency must be a string or integer'),
+            ({'title': 5}, 'title must be a string'),
+            ({'estimated_hours': 'nan'}, 'estimated_hours must be finite'),
+            ({'estimated_hours': 'inf'}, 'estimated_hours must be finite'),
+            ({'estimated_hours': [1]}, 'estimated_hours must be a number'),
+            ({'importance': 5.5}, 'importance must be a whole number'),
+            ({'importance': True}, 'importance must be a number'),
+            ({'due_date': 20300101}, 'due_date must be a YYYY-MM-DD string'),
+        ]
+        body = json.dumps(valid) + '\n' + ''.join(
+            json.dumps({**valid, 'id': f'bad{i}', **fields}) + '\n'
+            for i, (fields, _) in enumerate(bad)
+        )
+        response = self.client.post(
+            '/api/tasks/import/?format=jsonl', data=body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['skipped_rows']), (1, len(bad)))
+        for line, (error, (_, message)) in enumerate(zip(summary['errors'], bad), 2):
+            self.assertEqual(error, f'Line {line}: {message}')
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Fine'])
+
+    def test_csv_parse_errors_skip_the_row(self):
+        """Test that csv.Error on one line is reported and the import continues"""
+        from .transfer import import_tasks
+        lines = self.CSV.splitlines(keepends=True)
+        # A field over csv.field_size_limit() makes the reader raise csv.Error
+        lines.insert(2, f'x,{"B" * 200000},2030-01-01,1,5,\n')
+        summary = import_tasks(lines, 'csv')
+        self.assertEqual((summary['created'], summary['skipped_rows']), (3, 1))
+        self.assertTrue(summary['errors'][0].startswith('Line 3: field larger than field limit'))
+
+        lines.insert(4, 'y,Bad date,someday,1,5,\n')
+        summary = import_tasks(lines, 'csv')
+        self.assertTrue(summary['errors'][1].startswith('Line 5:'))
+
+    def test_undecodable_line_skips_the_row(self):
+        """Test that a line of invalid UTF-8 is reported like any other bad row"""
+        from .models import Task
+        body = self.CSV.encode('utf-8').replace(
+            b'b,Build it', b'x,Bad \xff bytes,2030-01-01,1,5,\nb,Build it'
+        )
+        response = self.client.post('/api/tasks/import/?format=csv', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['skipped_rows']), (3, 1))
+        self.assertEqual(summary['dependencies_created'], 2)
+        self.assertTrue(summary['errors'][0].startswith('Line 3: not valid UTF-8'))
+        self.assertEqual(Task.objects.get(title='Build it').dependencies.count(), 2)
+
+        response = self.client.post(
+            '/api/tasks/import/?format=jsonl&project=other',
+            data=b'{"title": "\xff"}\n{"title": "Ok", "due_date": "2030-01-01", "importance": 5}\n',
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.json()['errors'], ['Line 1: not valid UTF-8: invalid start byte'])
+        self.assertEqual(response.json()['created'], 1)
+
+    def test_failed_read_still_links_committed_batches(self):
+        """Test that batches committed before an input error get edges, order and a version bump"""
+        from .models import TableVersion, Task, task_version_key
+        from .transfer import import_tasks
+
+        def lines():
+            yield 'id,title,due_date,estimated_hours,importance,dependencies\n'
+            yield 'a,Ship,2030-01-10,2,8,c\n'
+            yield 'c,Design,2030-01-05,1,6,\n'
+            raise OSError('connection reset')
+
+        version = TableVersion.current(task_version_key())
+        with self.assertRaises(OSError):
+            import_tasks(lines(), 'csv', batch_size=2)
+        ship, design = Task.objects.get(title='Ship'), Task.objects.get(title='Design')
+        self.assertEqual(list(ship.dependencies.all()), [design])
+        self.assertLess(design.topo_order, ship.topo_order)
+        self.assertGreater(TableVersion.current(task_version_key()), version)
+
+    def test_export_round_trips_through_import(self):
+        """Test that an export re-imports into the same graph"""
+        import json
+        from .models import Task
+        from .transfer import export_tasks, import_tasks
+        import_tasks(self.CSV.splitlines(keepends=True), 'csv')
+        for file_format in ('csv', 'jsonl'):
+            exported = ''.join(export_tasks(file_format))
+            Task.objects.all().delete()
+            summary = import_tasks(exported.splitlines(keepends=True), file_format)
+            self.assertEqual((summary['created'], summary['dependencies_created']), (3, 2))
+        rows = [json.loads(line) for line in ''.join(export_tasks('jsonl')).splitlines()]
+        self.assertEqual(rows[-1]['title'], 'Build it')
+
+    def test_import_and_export_endpoints(self):
+        """Test the streaming HTTP import and export endpoints"""
+        response = self.client.post(
+            '/api/tasks/import/?format=csv', data=self.CSV, content_type='text/csv'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 3)
+
+        response = self.client.get('/api/tasks/export/?format=jsonl')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+
+        self.assertEqual(self.client.get('/api/tasks/export/?format=xml').status_code, 400)
+
+
+class ApiProfileTests(TestCase):
+
+    def test_api_profile_serves_json_without_loading_scorer(self):
+        """Test that a fresh API-only worker answers health checks without importing the scorer"""
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command(
+            'coldstart', profiles=['task_analyzer.settings_api'], runs=1, requests=5, stdout=out
+        )
+        result = json.loads(out.getvalue())['results']['task_analyzer.settings_api']
+        self.assertEqual(result['status'], '200 OK')
+        self.assertFalse(result['scorer_loaded_after_first_request'])
+
+
+class ProjectScopingTests(TestCase):
+
+    def make(self, project, title='Task', importance=5, **kwargs):
+        from .models import Task
+        return Task.objects.create(
+            project=project, title=title, due_date=date.today() + timedelta(days=3),
+            estimated_hours=2, importance=importance, **kwargs
+        )
+
+    def test_listing_and_dependencies_stay_in_project(self):
+        """Test that listings are per project and dependencies cannot cross projects"""
+        alpha = self.make('alpha', 'Alpha task')
+        self.make('beta', 'Beta task')
+
+        response = self.client.get('/api/tasks/?project=alpha')
+        self.assertEqual([task['title'] for task in response.json()['results']], ['Alpha task'])
+        self.assertEqual(self.client.get('/api/tasks/?project=no%20spaces').status_code, 400)
+
+        response = self.client.post('/api/tasks/', {
+            'project': 'beta', 'title': 'Cross', 'due_date': '2030-01-01',
+            'estimated_hours': 1, 'importance': 5, 'dependencies': [alpha.pk],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('dependencies', response.json())
+
+        response = self.client.patch(
+            f'/api/tasks/{alpha.pk}/', {'project': 'beta'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_project_ranking_cached_until_own_project_writes(self):
+        """Test that a project's cached ranking survives writes to other projects only"""
+        from .ranking import rank_project
+        from .scoring import TaskPriorityScorer
+        self.make('alpha', 'Low', importance=2)
+        self.make('alpha', 'High', importance=9)
+        scorer = TaskPriorityScorer()
+
+        first, version = rank_project(scorer, 'alpha')
+        self.assertEqual([task['title'] for task in first], ['High', 'Low'])
+
+        self.make('beta', 'Elsewhere', importance=10)
+        with self.assertNumQueries(1):  # just the version lookup
+            cached, cached_version = rank_project(scorer, 'alpha')
+        self.assertEqual((cached, cached_version), (first, version))
+
+        self.make('alpha', 'Urgent', importance=10)
+        refreshed, new_version = rank_project(scorer, 'alpha')
+        self.assertGreater(new_version, version)
+        self.assertEqual(refreshed[0]['title'], 'Urgent')
+
+    def test_analyze_and_suggest_stored_project(self):
+        """Test that analyze/suggest accept a project in place of a task list"""
+        self.make('alpha', 'Alpha task', importance=9)
+        self.make('beta', 'Beta task')
+
+        response = self.client.post(
+            '/api/tasks/analyze/', {'project': 'alpha'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['title'] for task in response.json()['tasks']], ['Alpha task'])
+
+        response = self.client.post(
+            '/api/tasks/suggest/', {'project': 'beta', 'count': 1}, content_type='application/json'
+        )
+        self.assertEqual(response.json()['suggestions'][0]['task']['title'], 'Beta task')
+
+        response = self.client.post('/api/tasks/analyze/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,161 @@
+"""
+Online topological ordering for the task dependency graph.
+
+Every stored task carries a ``topo_order`` such that a task always sorts
+after the tasks it depends on. Inserting an edge only has to repair the
+order when it points "backwards", and then only the tasks whose position
+lies between the two endpoints can be affected (Pearce & Kelly, "A
+Dynamic Topological Sort Algorithm for Directed Acyclic Graphs", 2006).
+"""
+
+import heapq
+from typing import Callable, Dict, Hashable, Iterable, List, Set
+
+Node = Hashable
+# Given a frontier of nodes and an order bound, return {neighbour: order}
+# for the neighbours whose order lies inside the bound.
+NeighbourFn = Callable[[Set[Node], int], Dict[Node, int]]
+
+
+class CycleError(ValueError):
+    """Raised when adding a dependency would close a cycle."""
+
+
+def reorder_for_edge(source: Node, target: Node, order: Dict[Node, int],
+                     successors: NeighbourFn,
+                     predecessors: NeighbourFn) -> Dict[Node, int]:
+    """
+    Repair the topological order for a new edge ``source -> target``
+    (``source`` must come first).
+
+    ``order`` holds the current order of at least ``source`` and
+    ``target``. ``successors(frontier, upper)`` must return the successors
+    of ``frontier`` with order <= ``upper``; ``predecessors(frontier,
+    lower)`` the predecessors with order >= ``lower``. Both are called
+    once per BFS level, so callers backed by a database pay one query per
+    level of the affected region rather than one per node.
+
+    Returns ``{node: new_order}`` for the nodes that have to move, which
+    is empty when the edge already agrees with the order. Raises
+    ``CycleError`` if ``target`` already reaches ``source``.
+    """
+    if source == target:
+        raise CycleError("A task cannot depend on itself")
+
+    lower, upper = order[target], order[source]
+    if upper < lower:
+        return {}
+
+    # Forward from target: everything it reaches inside the affected region
+    forward = _search(target, upper, successors, order, stop=source)
+    # Backward from source: everything that reaches it inside the region
+    backward = _search(source, lower, predecessors, order)
+
+    # Backward set goes first, then the forward set, each keeping its
+    # relative order, reusing the same pool of order slots.
+    moved = sorted(backward, key=order.__getitem__) + sorted(forward, key=order.__getitem__)
+    slots = sorted(order[node] for node in moved)
+
+    return {
+        node: slot
+        for node, slot in zip(moved, slots)
+        if order[node] != slot
+    }
+
+
+def _search(start: Node, bound: int, neighbours: NeighbourFn,
+            order: Dict[Node, int], stop: Node = None) -> Set[Node]:
+    visited = {start}
+    frontier = {start}
+    while frontier:
+        found = neighbours(frontier, bound)
+        if stop is not None and stop in found:
+            raise CycleError("Adding this dependency would create a circular dependency")
+        order.update(found)
+        frontier = set(found) - visited
+        visited |= frontier
+    return visited
+
+
+def initial_order(nodes: Iterable[Node], edges: Iterable[tuple]) -> Dict[Node, int]:
+    """
+    Kahn's algorithm over ``(before, after)`` edges, always taking the
+    earliest ready node in input order, so input that is already
+    topologically sorted keeps its order. Nodes caught in an existing
+    cycle are appended at the end in input order.
+    """
+    nodes = list(nodes)
+    position = {node: index for index, node in enumerate(nodes)}
+    indegree = [0] * len(nodes)
+    successors = [[] for _ in nodes]
+    for before, after in edges:
+        successors[position[before]].append(position[after])
+        indegree[position[after]] += 1
+
+    ready = [index for index, degree in enumerate(indegree) if degree == 0]
+    ordered = []
+    while ready:
+        index = heapq.heappop(ready)
+        ordered.append(index)
+        for nxt in successors[index]:
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                heapq.heappush(ready, nxt)
+
+    placed = set(ordered)
+    ordered.extend(index for index in range(len(nodes)) if index not in placed)
+    return {nodes[index]: rank for rank, index in enumerate(ordered, 1)}
+
+
+def cycle_edges(nodes: Iterable[Node], edges: Iterable[tuple]) -> List[tuple]:
+    """
+    The ``(before, after)`` edges to drop to make the graph acyclic:
+    inside each strongly connected component (Tarjan, iterative), those
+    pointing backwards in input order. Edges between components never lie
+    on a cycle, so dependencies merely downstream of a cycle are kept.
+    """
+    nodes = list(nodes)
+    edges = list(edges)
+    position = {node: index for index, node in enumerate(nodes)}
+    successors = [[] for _ in nodes]
+    for before, after in edges:
+        successors[position[before]].append(position[after])
+
+    index, low = {}, {}
+    component = [None] * len(nodes)
+    stack, on_stack = [], set()
+    for root in range(len(nodes)):
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work[-1]
+            if edge == 0 and node not in index:
+                index[node] = low[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+            if edge < len(successors[node]):
+                work[-1] = (node, edge + 1)
+                nxt = successors[node][edge]
+                if nxt not in index:
+                    work.append((nxt, 0))
+                elif nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component[member] = node
+                    if member == node:
+                        break
+
+    return [
+        (before, after) for before, after in edges
+        if component[position[before]] == component[position[after]]
+        and position[before] >= position[after]
+    ]
@@ -0,0 +1,372 @@
+"""
+Streaming CSV / JSONL import and export of stored tasks.
+
+Both formats carry ``id, title, due_date, estimated_hours, importance,
+dependencies``. On import ``id`` is only a reference used by other rows'
+``dependencies`` (in CSV a ``;``-separated list); every task gets a fresh
+primary key. Both directions work on one project at a time. Export walks
+the project in topological order so a re-import never has to reorder
+anything.
+"""
+
+import csv
+import json
+import math
+from array import array
+from datetime import date
+from itertools import islice
+
+from django.db import connection, transaction
+
+from .events import notify_ranking_change
+from .models import DEFAULT_PROJECT, TableVersion, Task, task_version_key
+from .topology import initial_order
+
+FORMATS = ('csv', 'jsonl')
+FIELDS = ['id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies']
+CSV_DEPENDENCY_SEPARATOR = ';'
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+
+
+class _LineBuffer:
+    """File-like sink for csv.writer that hands back each written row"""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(project):
+    """
+    A project's stored tasks as ``to_dict``-shaped rows in topological order, read a
+    chunk at a time with the chunk's dependency ids fetched in one query
+    on the through table, so memory stays flat however many rows there are.
+    """
+    rows = (
+        Task.objects.filter(project=project).order_by('topo_order', 'id')
+        .values_list('id', 'title', 'due_date', 'estimated_hours', 'importance')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    Through = Task.dependencies.through
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        dependencies = {}
+        edges = Through.objects.filter(
+            from_task_id__in=[row[0] for row in chunk]
+        ).values_list('from_task_id', 'to_task_id')
+        for task_id, dependency_id in edges:
+            dependencies.setdefault(task_id, []).append(dependency_id)
+        for task_id, title, due_date, estimated_hours, importance in chunk:
+            yield {
+                'id': task_id,
+                'project': project,
+                'title': title,
+                'due_date': due_date.isoformat(),
+                'estimated_hours': float(estimated_hours),
+                'importance': importance,
+                'dependencies': sorted(dependencies.get(task_id, ())),
+            }
+
+
+def export_tasks(file_format, project=DEFAULT_PROJECT):
+    """Yield a project's stored tasks as CSV or JSONL text, one row at a time."""
+    if file_format not in FORMATS:
+        raise ValueError(f"Invalid format. Choose from: {list(FORMATS)}")
+
+    if file_format == 'csv':
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(FIELDS)
+        for row in _export_rows(project):
+            row['dependencies'] = CSV_DEPENDENCY_SEPARATOR.join(
+                str(dep) for dep in row['dependencies']
+            )
+            yield writer.writerow([row[field] for field in FIELDS])
+    else:
+        for row in _export_rows(project):
+            yield json.dumps(row) + '\n'
+
+
+def _decode_lines(lines, invalid):
+    """
+    Decode ``lines`` (text, or UTF-8 bytes straight off a request body)
+    one at a time. Undecodable lines are passed on with replacement
+    characters and their reason recorded in ``invalid`` by line number.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError as exc:
+                invalid[line_number] = f'not valid UTF-8: {exc.reason}'
+                line = line.decode('utf-8', 'replace')
+        yield line
+
+
+def _parse_rows(lines, file_format):
+    """
+    Yield ``(line_number, record)`` for each record in ``lines``. A record
+    that cannot be decoded is yielded as the exception instead, so one bad
+    line does not end the import.
+    """
+    invalid = {}
+    lines = _decode_lines(lines, invalid)
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        while True:
+            first_line = reader.line_num + 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The reader resumes at the next line; line_num has not
+                # counted the failed one yet
+                yield reader.line_num + 1, ValueError(str(exc))
+                continue
+            # A quoted field can span lines; any undecodable one spoils the row
+            bad = [n for n in range(first_line, reader.line_num + 1) if n in invalid]
+            if bad:
+                yield bad[0], ValueError(invalid[bad[0]])
+                continue
+            dependencies = (row.get('dependencies') or '').strip()
+            row['dependencies'] = [
+                dep.strip() for dep in dependencies.split(CSV_DEPENDENCY_SEPARATOR) if dep.strip()
+            ]
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(lines, 1):
+            if line_number in invalid:
+                yield line_number, ValueError(invalid[line_number])
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+                continue
+            if not isinstance(record, dict):
+                record = ValueError('expected a JSON object')
+            yield line_number, record
+
+
+def _reference(value, name):
+    """A row id or dependency reference as text; JSON may give ints"""
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f'{name} must be a string or integer')
+    return str(value).strip()
+
+
+def _number(value, name, convert):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f'{name} must be a number')
+    try:
+        return convert(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number, not {value!r}')
+
+
+def _build_task(row, topo_order, project):
+    """
+    Validate one parsed row; returns ``(task, ref, dependency_refs)`` or
+    raises ValueError. JSON rows can carry any type, so every field is
+    type-checked before it is used.
+    """
+    title = row.get('title')
+    if title is not None and not isinstance(title, str):
+        raise ValueError('title must be a string')
+    title = (title or '').strip()
+    if not title:
+        raise ValueError('missing title')
+    if len(title) > 200:
+        raise ValueError('title longer than 200 characters')
+
+    due_date = row.get('due_date')
+    if not due_date:
+        raise ValueError('missing due_date')
+    if not isinstance(due_date, str):
+        raise ValueError('due_date must be a YYYY-MM-DD string')
+    due_date = date.fromisoformat(due_date)
+
+    estimated_hours = row.get('estimated_hours')
+    if estimated_hours in (None, ''):
+        estimated_hours = 1.0
+    else:
+        estimated_hours = _number(estimated_hours, 'estimated_hours', float)
+    # nan compares false against everything, so check finiteness first
+    if not math.isfinite(estimated_hours):
+        raise ValueError('estimated_hours must be finite')
+    if estimated_hours < 0.5:
+        raise ValueError('estimated_hours must be at least 0.5')
+
+    importance = row.get('importance')
+    if importance in (None, ''):
+        raise ValueError('missing importance')
+    if isinstance(importance, float):
+        if not importance.is_integer():
+            raise ValueError('importance must be a whole number')
+        importance = int(importance)
+    importance = _number(importance, 'importance', int)
+    if not 1 <= importance <= 10:
+        raise ValueError('importance must be between 1 and 10')
+
+    ref = row.get('id')
+    ref = None if ref in (None, '') else _reference(ref, 'id')
+
+    dependencies = row.get('dependencies')
+    if dependencies is None:
+        dependencies = []
+    if not isinstance(dependencies, list):
+        raise ValueError('dependencies must be a list')
+    dependencies = [_reference(dep, 'dependency') for dep in dependencies]
+
+    task = Task(
+        project=project,
+        title=title,
+        due_date=due_date,
+        estimated_hours=estimated_hours,
+        importance=importance,
+        topo_order=topo_order,
+    )
+    return task, ref, dependencies
+
+
+def import_tasks(lines, file_format, batch_size=IMPORT_BATCH_SIZE, project=DEFAULT_PROJECT):
+    """
+    Import tasks from an iterable of text lines (or UTF-8 byte lines) into
+    ``project``.
+
+    Rows are parsed incrementally and inserted with ``bulk_create`` in one
+    transaction per batch. Dependency edges may point forwards or
+    backwards in the file; they are resolved once all rows are in, given a
+    fresh topological order, and inserted in batches too. Edges that
+    reference unknown or invalid rows, or that would close a cycle, are
+    skipped and counted. Invalid rows are skipped and reported.
+
+    If reading the input fails partway, the batches already committed are
+    still linked, ordered and published before the error propagates, so
+    the project is never left with tasks the caches do not know about.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Invalid format. Choose from: {list(FORMATS)}")
+
+    base_order = Task.next_topo_order()
+    id_map = {}
+    # Pending edges as parallel int arrays of row indexes: dependent, dependency ref
+    edge_rows = array('q')
+    edge_refs = []
+    created_pks = array('q')
+    errors = []
+    skipped_rows = 0
+
+    batch, batch_refs = [], []
+
+    def flush():
+        with transaction.atomic():
+            Task.objects.bulk_create(batch)
+        for task, ref in zip(batch, batch_refs):
+            if ref is not None:
+                id_map.setdefault(ref, task.pk)
+            created_pks.append(task.pk)
+        batch.clear()
+        batch_refs.clear()
+
+    try:
+        row_index = 0
+        for line_number, row in _parse_rows(lines, file_format):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                task, ref, dependencies = _build_task(row, base_order + row_index, project)
+            except ValueError as exc:
+                skipped_rows += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f'Line {line_number}: {exc}')
+                continue
+
+            for dep in dependencies:
+                edge_rows.append(row_index)
+                edge_refs.append(dep)
+
+            batch.append(task)
+            batch_refs.append(ref)
+            row_index += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        dependencies_created, skipped_dependencies = _link_imported(
+            created_pks, id_map, edge_rows, edge_refs, base_order, batch_size, project
+        )
+
+    return {
+        'created': len(created_pks),
+        'dependencies_created': dependencies_created,
+        'skipped_rows': skipped_rows,
+        'skipped_dependencies': skipped_dependencies,
+        'errors': errors,
+    }
+
+
+def _link_imported(created_pks, id_map, edge_rows, edge_refs, base_order, batch_size, project):
+    """
+    Resolve and insert the edges among committed rows, repair their
+    topological order and publish the change. Returns the number of edges
+    created and skipped.
+    """
+    # Resolve references to (dependency_pk, dependent_pk) edges; rows past
+    # the last committed batch were never inserted
+    edges = []
+    unresolved = 0
+    for dependent_row, ref in zip(edge_rows, edge_refs):
+        if dependent_row >= len(created_pks):
+            continue
+        dependency_pk = id_map.get(ref)
+        if dependency_pk is None:
+            unresolved += 1
+        else:
+            edges.append((dependency_pk, created_pks[dependent_row]))
+
+    # A row may list the same dependency twice; count it once
+    edges = list(dict.fromkeys(edges))
+    order = initial_order(created_pks, edges)
+    # Nodes Kahn could not place sit on a cycle; keep only edges that agree
+    # with the order so the stored graph stays acyclic.
+    acyclic_edges = [(a, b) for a, b in edges if order[a] < order[b]]
+    cyclic = len(edges) - len(acyclic_edges)
+
+    moved = [
+        (base_order + order[pk] - 1, pk)
+        for index, pk in enumerate(created_pks)
+        if order[pk] - 1 != index
+    ]
+
+    # Plain executemany: bulk_update's CASE expression is quadratic-ish in
+    # the batch size and dominated import time.
+    table = connection.ops.quote_name(Task._meta.db_table)
+    Through = Task.dependencies.through
+    for start in range(0, len(moved), batch_size):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {table} SET topo_order = %s WHERE id = %s',
+                moved[start:start + batch_size]
+            )
+    for start in range(0, len(acyclic_edges), batch_size):
+        with transaction.atomic():
+            Through.objects.bulk_create(
+                [Through(to_task_id=a, from_task_id=b) for a, b in acyclic_edges[start:start + batch_size]],
+                ignore_conflicts=True
+            )
+
+    if created_pks:
+        # bulk_create skips the model signals, so do their work once here
+        TableVersion.bump(task_version_key())
+        TableVersion.bump(task_version_key(project))
+        notify_ranking_change(created_pks, project)
+
+    return len(acyclic_edges), unresolved + cyclic
@@ -26,6 +26,10 @@ urlpatterns = [
     # Custom endpoints BEFORE the router
     path('tasks/analyze/', views.analyze_tasks, name='analyze-tasks'),
     path('tasks/suggest/', views.suggest_tasks, name='suggest-tasks'),
+    path('tasks/sensitivity/', views.sensitivity_analysis, name='sensitivity-analysis'),
+    path('tasks/events/', views.ranking_events, name='ranking-events'),
+    path('tasks/export/', views.export_tasks_view, name='export-tasks'),
+    path('tasks/import/', views.import_tasks_view, name='import-tasks'),
     path('health/', views.health_check, name='health-check'),
     path('strategies/', views.TaskAnalysisView.as_view(), name='strategies'),
     
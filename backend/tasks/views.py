@@ -1,27 +1,178 @@
+import hashlib
+import json
+from datetime import date
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_GET, require_POST
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Task
-from .serializers import TaskSerializer, TaskAnalysisInputSerializer
-from .scoring import TaskPriorityScorer
+from .models import (
+    DEFAULT_PROJECT, MAX_TRAVERSAL_DEPTH, TableVersion, Task, clean_project, task_version_key
+)
+from .pagination import TaskCursorPagination
+from .serializers import TaskSerializer, TaskAnalysisInputSerializer, TaskSensitivityInputSerializer
+
+# The scorer, sensitivity analysis, event feed and import/export modules are
+# imported inside the views that use them, so a worker only loads them when
+# such a request first arrives (see task_analyzer/settings_api.py).
+
+
+def project_param(params):
+    """The ``project`` query parameter, defaulting to the default project"""
+    return clean_project(params.get('project', DEFAULT_PROJECT))
+
+
+def _invalid_project(exc):
+    return {'error': 'Invalid input data', 'details': {'project': exc.messages}}
+
+
+def task_table_etag(request, *args, **kwargs):
+    """Weak ETag for single-task reads, derived from the task table write counter"""
+    return f'W/"tasks-{TableVersion.current(task_version_key())}"'
 
 
+def task_list_etag(request, *args, **kwargs):
+    """Weak ETag for a project's task listing, from that project's write counter"""
+    try:
+        project = project_param(request.GET)
+    except DjangoValidationError:
+        return None
+    return f'W/"tasks-{project}-{TableVersion.current(task_version_key(project))}"'
+
+
+@method_decorator(condition(etag_func=task_list_etag), name='list')
+@method_decorator(condition(etag_func=task_table_etag), name='retrieve')
 class TaskViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Task CRUD operations.
+    Listings are scoped to one project (``?project=``, default ``default``).
     """
-    queryset = Task.objects.all()
+    queryset = Task.objects.prefetch_related('dependencies')
     serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.filter(project=self.project)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.project = project_param(request.query_params)
+        except DjangoValidationError as exc:
+            return Response(_invalid_project(exc), status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'], url_path='analyze-stored')
+    def analyze_stored(self, request):
+        """
+        GET /api/tasks/analyze-stored/?project=default&strategy=smart&as_of=YYYY-MM-DD&forecast=true
+        Analyze and sort a project's stored tasks by priority score.
+        """
+        from .ranking import rank_project
+        from .scoring import TaskPriorityScorer
+
+        try:
+            project = project_param(request.query_params)
+        except DjangoValidationError as exc:
+            return Response(_invalid_project(exc), status=status.HTTP_400_BAD_REQUEST)
+        strategy = request.query_params.get('strategy', 'smart')
+        forecast = request.query_params.get('forecast', 'false').lower() in ('true', '1', 'yes')
+        try:
+            as_of = request.query_params.get('as_of')
+            as_of = date.fromisoformat(as_of) if as_of else None
+            scorer = TaskPriorityScorer(strategy=strategy, as_of=as_of)
+        except ValueError as e:
+            return Response(
+                {
+                    'error': 'Invalid input data',
+                    'details': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Dependency edges are checked for cycles when they are written
+        scored_tasks, _ = rank_project(scorer, project, forecast=forecast)
+
+        return Response({
+            'tasks': scored_tasks,
+            'project': project,
+            'strategy_used': strategy,
+            'as_of': scorer.as_of,
+            'total_tasks': len(scored_tasks),
+            'circular_dependencies': False,
+            'message': 'Tasks analyzed successfully'
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def blockers(self, request, pk=None):
+        """
+        GET /api/tasks/{id}/blockers/?transitive=true&max_depth=N
+        Tasks that must be completed before this one.
+        """
+        return self._dependency_walk(request, 'dependencies')
+
+    @action(detail=True, methods=['get'])
+    def blocked(self, request, pk=None):
+        """
+        GET /api/tasks/{id}/blocked/?transitive=true&max_depth=N
+        Tasks that cannot start until this one is completed.
+        """
+        return self._dependency_walk(request, 'dependents')
+
+    def _dependency_walk(self, request, direction):
+        task = self.get_object()
+
+        transitive = request.query_params.get('transitive', 'false').lower() in ('true', '1', 'yes')
+        max_depth = MAX_TRAVERSAL_DEPTH if transitive else 1
+        if transitive and 'max_depth' in request.query_params:
+            try:
+                max_depth = int(request.query_params['max_depth'])
+                if not 1 <= max_depth <= MAX_TRAVERSAL_DEPTH:
+                    raise ValueError
+            except ValueError:
+                return Response(
+                    {
+                        'error': 'Invalid max_depth',
+                        'details': f'max_depth must be an integer between 1 and {MAX_TRAVERSAL_DEPTH}'
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if direction == 'dependencies':
+            related, truncated = task.get_transitive_dependencies(max_depth=max_depth)
+        else:
+            related, truncated = task.get_transitive_dependents(max_depth=max_depth)
+
+        return Response({
+            'task_id': task.id,
+            'transitive': transitive,
+            'max_depth': max_depth,
+            'truncated': truncated,
+            'total_tasks': len(related),
+            'tasks': related
+        }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 def analyze_tasks(request):
     """
     POST /api/tasks/analyze/
-    Analyze and sort tasks by priority score.
+    Analyze and sort tasks by priority score: either the given task list,
+    or a project's stored tasks (served from its cached ranking).
     """
+    from .ranking import rank_project
+    from .scoring import TaskPriorityScorer
+
     input_serializer = TaskAnalysisInputSerializer(data=request.data)
     
     if not input_serializer.is_valid():
@@ -33,21 +184,32 @@ def analyze_tasks(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    tasks = input_serializer.validated_data['tasks']
+    tasks = input_serializer.validated_data.get('tasks')
+    project = input_serializer.validated_data.get('project')
     strategy = input_serializer.validated_data.get('strategy', 'smart')
+    as_of = input_serializer.validated_data.get('as_of')
+    forecast = input_serializer.validated_data.get('forecast', False)
     
-    for idx, task in enumerate(tasks):
+    for idx, task in enumerate(tasks or ()):
         if 'id' not in task:
             task['id'] = f"task_{idx + 1}"
     
     try:
-        scorer = TaskPriorityScorer(strategy=strategy)
-        scored_tasks = scorer.score_and_sort_tasks(tasks)
-        has_circular = scorer.detect_circular_dependencies(tasks)
+        scorer = TaskPriorityScorer(strategy=strategy, as_of=as_of)
+        if project is not None:
+            # Stored dependencies are kept acyclic
+            scored_tasks, _ = rank_project(scorer, project, forecast=forecast)
+            has_circular = False
+        else:
+            # One-off client payloads rarely repeat; caching their
+            # components costs more than it saves
+            scored_tasks, has_circular = scorer.rank_tasks(tasks, forecast=forecast)
         
         return Response({
             'tasks': scored_tasks,
+            'project': project,
             'strategy_used': strategy,
+            'as_of': scorer.as_of,
             'total_tasks': len(scored_tasks),
             'circular_dependencies': has_circular,
             'message': 'Tasks analyzed successfully'
@@ -67,8 +229,12 @@ def analyze_tasks(request):
 def suggest_tasks(request):
     """
     POST /api/tasks/suggest/
-    Get top 3 task suggestions with explanations.
+    Get top 3 task suggestions with explanations, from the given task list
+    or a project's stored tasks.
     """
+    from .ranking import rank_project
+    from .scoring import TaskPriorityScorer
+
     input_serializer = TaskAnalysisInputSerializer(data=request.data)
     
     if not input_serializer.is_valid():
@@ -80,21 +246,29 @@ def suggest_tasks(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    tasks = input_serializer.validated_data['tasks']
+    tasks = input_serializer.validated_data.get('tasks')
+    project = input_serializer.validated_data.get('project')
     strategy = input_serializer.validated_data.get('strategy', 'smart')
+    as_of = input_serializer.validated_data.get('as_of')
     count = request.data.get('count', 3)
     
-    for idx, task in enumerate(tasks):
+    for idx, task in enumerate(tasks or ()):
         if 'id' not in task:
             task['id'] = f"task_{idx + 1}"
     
     try:
-        scorer = TaskPriorityScorer(strategy=strategy)
-        suggestions = scorer.get_top_suggestions(tasks, count=count)
+        scorer = TaskPriorityScorer(strategy=strategy, as_of=as_of)
+        if project is not None:
+            ranking, _ = rank_project(scorer, project)
+            suggestions = scorer.suggestions_from_ranking(ranking, count=count)
+        else:
+            suggestions = scorer.get_top_suggestions(tasks, count=count)
         
         return Response({
             'suggestions': suggestions,
+            'project': project,
             'strategy_used': strategy,
+            'as_of': scorer.as_of,
             'message': f'Top {len(suggestions)} task suggestions generated'
         }, status=status.HTTP_200_OK)
     
@@ -108,6 +282,175 @@ def suggest_tasks(request):
         )
 
 
+@api_view(['POST'])
+def sensitivity_analysis(request):
+    """
+    POST /api/tasks/sensitivity/
+    For each strategy multiplier, the weight ranges over which the top-k
+    set is unchanged and the weights at which tasks enter or leave it.
+    """
+    from .ranking import project_tasks
+    from .scoring import TaskPriorityScorer
+    from .sensitivity import weight_sensitivity
+
+    input_serializer = TaskSensitivityInputSerializer(data=request.data)
+    
+    if not input_serializer.is_valid():
+        return Response(
+            {
+                'error': 'Invalid input data',
+                'details': input_serializer.errors
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    tasks = input_serializer.validated_data.get('tasks')
+    project = input_serializer.validated_data.get('project')
+    if project is not None:
+        tasks = project_tasks(project)
+    strategy = input_serializer.validated_data.get('strategy', 'smart')
+    as_of = input_serializer.validated_data.get('as_of')
+    top_k = input_serializer.validated_data['top_k']
+    max_weight = input_serializer.validated_data['max_weight']
+    
+    for idx, task in enumerate(tasks):
+        if 'id' not in task:
+            task['id'] = f"task_{idx + 1}"
+    
+    try:
+        scorer = TaskPriorityScorer(strategy=strategy, as_of=as_of)
+        factors = weight_sensitivity(scorer, tasks, top_k=top_k, max_weight=max_weight)
+        
+        return Response({
+            'factors': factors,
+            'project': project,
+            'strategy_used': strategy,
+            'as_of': scorer.as_of,
+            'top_k': top_k,
+            'message': 'Weight sensitivity analyzed successfully'
+        }, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response(
+            {
+                'error': 'Error analyzing weight sensitivity',
+                'details': str(e)
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+async def ranking_events(request):
+    """
+    GET /api/tasks/events/?project=default&strategy=smart
+    Server-sent events: the current ranking of a project's tasks, then a
+    coalesced diff of changed scores and ranks after every write.
+    Requires an ASGI deployment.
+    """
+    from .events import stream_ranking_events
+    from .scoring import TaskPriorityScorer
+
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {
+                'error': 'Streaming unavailable',
+                'details': 'The ranking event stream is only served under ASGI'
+            },
+            status=501
+        )
+
+    try:
+        project = project_param(request.GET)
+    except DjangoValidationError as exc:
+        return JsonResponse(_invalid_project(exc), status=400)
+    strategy = request.GET.get('strategy', 'smart')
+    if strategy not in TaskPriorityScorer.STRATEGIES:
+        return JsonResponse(
+            {
+                'error': 'Invalid input data',
+                'details': f"Invalid strategy. Choose from: {list(TaskPriorityScorer.STRATEGIES)}"
+            },
+            status=400
+        )
+
+    response = StreamingHttpResponse(
+        stream_ranking_events(strategy, project),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def _invalid_format_response(file_format):
+    from .transfer import FORMATS
+
+    return JsonResponse(
+        {
+            'error': 'Invalid input data',
+            'details': f"Invalid format {file_format!r}. Choose from: {list(FORMATS)}"
+        },
+        status=400
+    )
+
+
+@require_GET
+def export_tasks_view(request):
+    """
+    GET /api/tasks/export/?format=csv|jsonl&project=default
+    Stream a project's tasks with their dependencies, in topological order.
+    """
+    from .transfer import FORMATS, export_tasks
+
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in FORMATS:
+        return _invalid_format_response(file_format)
+    try:
+        project = project_param(request.GET)
+    except DjangoValidationError as exc:
+        return JsonResponse(_invalid_project(exc), status=400)
+
+    response = StreamingHttpResponse(
+        export_tasks(file_format, project=project),
+        content_type=EXPORT_CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{project}-tasks.{file_format}"'
+    return response
+
+
+@csrf_exempt
+@require_POST
+def import_tasks_view(request):
+    """
+    POST /api/tasks/import/?format=csv|jsonl&project=default
+    Bulk-load tasks into a project from the raw request body, read line by line rather
+    than buffered whole.
+    """
+    from .transfer import FORMATS, import_tasks
+
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in FORMATS:
+        return _invalid_format_response(file_format)
+    try:
+        project = project_param(request.GET)
+    except DjangoValidationError as exc:
+        return JsonResponse(_invalid_project(exc), status=400)
+
+    # Raw byte lines: each is decoded on its own so a bad one is reported
+    # and skipped like any other malformed row
+    summary = import_tasks(request, file_format, project=project)
+    summary['message'] = f"Imported {summary['created']} tasks"
+    return JsonResponse(summary, status=201)
+
+
 @api_view(['GET'])
 def health_check(request):
     """
@@ -120,6 +463,42 @@ def health_check(request):
     }, status=status.HTTP_200_OK)
 
 
+STRATEGY_DESCRIPTIONS = {
+    'smart': {
+        'name': 'Smart Balance',
+        'description': 'Balanced approach considering all factors equally',
+        'best_for': 'General task prioritization'
+    },
+    'fastest': {
+        'name': 'Fastest Wins',
+        'description': 'Prioritizes quick, low-effort tasks for momentum',
+        'best_for': 'When you need quick progress and motivation'
+    },
+    'impact': {
+        'name': 'High Impact',
+        'description': 'Focuses on importance and blocking tasks',
+        'best_for': 'When you want to maximize value delivered'
+    },
+    'deadline': {
+        'name': 'Deadline Driven',
+        'description': 'Emphasizes urgency and time-sensitive tasks',
+        'best_for': 'When you have tight deadlines to meet'
+    }
+}
+
+STRATEGIES_PAYLOAD = {
+    'strategies': STRATEGY_DESCRIPTIONS,
+    'default': 'smart',
+    'message': 'Available sorting strategies'
+}
+
+STRATEGIES_ETAG = '"strategies-%s"' % hashlib.sha256(
+    json.dumps(STRATEGIES_PAYLOAD, sort_keys=True).encode('utf-8')
+).hexdigest()[:16]
+
+STRATEGIES_MAX_AGE = 60 * 60 * 24
+
+
 class TaskAnalysisView(APIView):
     """
     Class-based view for task analysis with additional features.
@@ -129,31 +508,10 @@ class TaskAnalysisView(APIView):
         return analyze_tasks(request)
     
     def get(self, request):
-        strategies = {
-            'smart': {
-                'name': 'Smart Balance',
-                'description': 'Balanced approach considering all factors equally',
-                'best_for': 'General task prioritization'
-            },
-            'fastest': {
-                'name': 'Fastest Wins',
-                'description': 'Prioritizes quick, low-effort tasks for momentum',
-                'best_for': 'When you need quick progress and motivation'
-            },
-            'impact': {
-                'name': 'High Impact',
-                'description': 'Focuses on importance and blocking tasks',
-                'best_for': 'When you want to maximize value delivered'
-            },
-            'deadline': {
-                'name': 'Deadline Driven',
-                'description': 'Emphasizes urgency and time-sensitive tasks',
-                'best_for': 'When you have tight deadlines to meet'
-            }
-        }
-        
-        return Response({
-            'strategies': strategies,
-            'default': 'smart',
-            'message': 'Available sorting strategies'
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        response = get_conditional_response(request, etag=STRATEGIES_ETAG)
+        if response is None:
+            response = Response(STRATEGIES_PAYLOAD, status=status.HTTP_200_OK)
+        response['ETag'] = STRATEGIES_ETAG
+        # The payload only changes on deploy, so let clients and proxies keep it
+        patch_cache_control(response, public=True, max_age=STRATEGIES_MAX_AGE)
+        return response